@@ -1,6 +1,10 @@
 from django.contrib import admin
-from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
-                            ShopCart, Tag)
+from recipes import images
+from recipes.models import (AuthorStats, Favorite, FeedEntry, Ingredient,
+                            IngredientAmount, Recipe, ShopCart,
+                            ShopCartIngredient, Tag)
+
+from .pagination import EstimatedCountPaginator
 
 
 @admin.register(Tag)
@@ -13,41 +17,89 @@ class TagAdmin(admin.ModelAdmin):
 @admin.register(Ingredient)
 class IngredientAdmin(admin.ModelAdmin):
     list_display = ('name', 'measurement_unit')
-    search_fields = ('name',)
-    list_filter = ('name',)
+    search_fields = ('^name',)
+    list_filter = ('measurement_unit',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Favorite)
 class FavoriteAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'recipe')
-    list_filter = ('user',)
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
+    search_fields = ('^user__username', '^recipe__name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(ShopCart)
 class ShopingCartAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'recipe')
-    list_filter = ('user',)
+    list_select_related = ('user', 'recipe')
+    autocomplete_fields = ('user', 'recipe')
+    search_fields = ('^user__username', '^recipe__name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(ShopCartIngredient)
+class ShopCartIngredientAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'ingredient', 'amount')
+    list_select_related = ('user', 'ingredient')
+    raw_id_fields = ('user', 'ingredient')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+@admin.register(FeedEntry)
+class FeedEntryAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'recipe', 'created_date')
+    list_select_related = ('user', 'recipe')
+    raw_id_fields = ('user', 'recipe')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(IngredientAmount)
-class IngredientAmount(admin.ModelAdmin):
-    list_display = ('id', 'ingredient', 'recipe')
-    search_fields = ('id', 'ingredient', 'recipe')
-    list_filter = ('id', 'ingredient', 'recipe')
+class IngredientAmountAdmin(admin.ModelAdmin):
+    list_display = ('id', 'ingredient', 'recipe', 'amount')
+    list_select_related = ('ingredient', 'recipe')
+    autocomplete_fields = ('ingredient', 'recipe')
+    search_fields = ('^recipe__name', '^ingredient__name')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 
 @admin.register(Recipe)
 class RecipeAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'author', 'count_favorite')
+    list_display = ('id', 'name', 'author', 'count_favorite', 'cart_count')
     list_display_links = ('id', 'name', )
-    list_filter = ('name', 'author', 'tags')
+    list_filter = ('tags',)
+    list_select_related = ('author',)
+    autocomplete_fields = ('author', 'ingredients')
+    search_fields = ('^name', '^author__username')
+    readonly_fields = ('favorites_count', 'cart_count')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
-    # @admin.display(
-    #     description='В избранных')
     def count_favorite(self, obj):
-        return obj.recipe_favorite.count()
+        return obj.favorites_count
+
+    count_favorite.short_description = 'В избранных'
+    count_favorite.admin_order_field = 'favorites_count'
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if 'image' in form.changed_data:
+            images.schedule_variants(obj)
+
 
-    # def count_favorite(self, obj):
-    #     print('hi')
-    #     user = self.context['request'].user
-    #     return Favorite.objects.filter(user=user, recipe=obj).count()
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(admin.ModelAdmin):
+    list_display = ('user', 'recipes_count')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    ordering = ('-recipes_count',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,84 @@
+from django.core.files.uploadedfile import UploadedFile
+from drf_extra_fields.fields import Base64ImageField
+from recipes.images import variant_urls
+from rest_framework import serializers
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField
+
+from api.uploads import validate_image_file
+
+
+def to_id(value):
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise TypeError(type(value).__name__)
+    return int(value)
+
+
+def resolve_ids(queryset, ids):
+    try:
+        ids = [to_id(pk) for pk in ids]
+    except (TypeError, ValueError):
+        raise serializers.ValidationError('Некорректный тип. Ожидался id.')
+    objects = queryset.in_bulk(ids)
+    missing = [pk for pk in dict.fromkeys(ids) if pk not in objects]
+    if missing:
+        raise serializers.ValidationError(
+            'Недопустимые id: '
+            f'{", ".join(str(pk) for pk in missing)} - объекты не существуют.'
+        )
+    return [objects[pk] for pk in ids]
+
+
+class BulkManyRelatedField(ManyRelatedField):
+    default_error_messages = {
+        'max_length': 'Не больше {max_length} элементов за один запрос.',
+    }
+
+    def __init__(self, max_length=None, **kwargs):
+        self.max_length = max_length
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        if self.max_length is not None and len(data) > self.max_length:
+            self.fail('max_length', max_length=self.max_length)
+        return resolve_ids(self.child_relation.get_queryset(), data)
+
+
+class BulkPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        max_length = kwargs.pop('max_length', None)
+        list_kwargs = {
+            'child_relation': cls(*args, **kwargs),
+            'max_length': max_length,
+        }
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BulkManyRelatedField(**list_kwargs)
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    def __init__(self, **kwargs):
+        kwargs.setdefault('source', '*')
+        super().__init__(**kwargs)
+
+    def to_representation(self, recipe):
+        urls = variant_urls(recipe.image, recipe.image_variants_ready)
+        request = self.context.get('request')
+        if request is None:
+            return urls
+        return {
+            variant: request.build_absolute_uri(url)
+            for variant, url in urls.items()
+        }
+
+
+class RecipeImageField(Base64ImageField):
+    def to_internal_value(self, data):
+        if isinstance(data, UploadedFile):
+            return validate_image_file(data)
+        return super().to_internal_value(data)
@@ -1,4 +1,6 @@
+from django.db.models import F
 from django_filters import rest_framework as filters
+from recipes import fulltext, tag_masks
 from recipes.models import Ingredient, Recipe, Tag
 from users.models import User
 
@@ -8,6 +10,7 @@ class CustomRecipeFilter(filters.FilterSet):
         field_name='tags__slug',
         to_field_name='slug',
         queryset=Tag.objects.all(),
+        method='get_tags',
     )
     author = filters.ModelChoiceFilter(
         queryset=User.objects.all()
@@ -18,6 +21,9 @@ class CustomRecipeFilter(filters.FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_shop_cart',
     )
+    search = filters.CharFilter(
+        method='get_search',
+    )
 
     class Meta:
         model = Recipe
@@ -26,16 +32,30 @@ class CustomRecipeFilter(filters.FilterSet):
             'author',
             'tags',
             'is_in_shopping_cart',
+            'search',
         )
 
+    def get_tags(self, queryset, name, tags):
+        if not tags:
+            return queryset
+        tag_ids = [tag.id for tag in tags]
+        if not tag_masks.fits(tag_ids):
+            return queryset.filter(tags__in=tags).distinct()
+        return queryset.annotate(
+            tags_match=F('tags_mask').bitand(tag_masks.tags_mask(tag_ids))
+        ).filter(tags_match__gt=0)
+
+    def get_search(self, queryset, name, value):
+        return fulltext.search(queryset, value)
+
     def get_favorite(self, queryset, name, item_value):
         if self.request.user.is_authenticated and item_value:
-            queryset = queryset.filter(recipe_favorite__user=self.request.user)
+            queryset = queryset.filter(is_favorited=True)
         return queryset
 
     def get_shop_cart(self, queryset, name, item_value):
         if self.request.user.is_authenticated and item_value:
-            queryset = queryset.filter(list_recipe__user=self.request.user)
+            queryset = queryset.filter(is_in_shopping_cart=True)
         return queryset
 
 
@@ -1,6 +1,149 @@
+import base64
+import hashlib
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            sql, params = queryset.order_by().query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate >= settings.ADMIN_COUNT_ESTIMATE_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class RecipePagination(CustomPagination):
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('-created_date', '-id')
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.is_cursor_mode(request)
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.count = None
+        if request.query_params.get(self.count_query_param) in ('1', 'true'):
+            self.count = self.get_cached_count(queryset, request)
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            date_field, id_field = self.cursor_fields
+            created_date, pk = position
+            queryset = queryset.filter(
+                Q(**{f'{date_field}__lt': created_date})
+                | Q(**{date_field: created_date, f'{id_field}__lt': pk})
+            )
+        results = list(queryset[:page_size + 1])
+        self.page = results[:page_size]
+        self.has_next = len(results) > page_size
+        return self.page
+
+    @property
+    def cursor_fields(self):
+        return tuple(field.lstrip('-') for field in self.ordering)
+
+    def is_cursor_mode(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['results'] = data
+        return Response(response)
+
+    def get_next_link(self):
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        date_field, id_field = self.cursor_fields
+        last = self.page[-1]
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(
+                getattr(last, date_field), getattr(last, id_field)),
+        )
+
+    @staticmethod
+    def encode_cursor(created_date, pk):
+        position = f'{created_date.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(position).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            created_date, pk = base64.urlsafe_b64decode(
+                encoded.encode()).decode().split('|')
+            created_date = parse_datetime(created_date)
+            pk = int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise ValidationError(
+                {self.cursor_query_param: self.invalid_cursor_message})
+        if created_date is None:
+            raise ValidationError(
+                {self.cursor_query_param: self.invalid_cursor_message})
+        return created_date, pk
+
+    def get_cached_count(self, queryset, request):
+        params = sorted(
+            (key, value)
+            for key, value in request.query_params.lists()
+            if key not in (self.cursor_query_param, self.page_size_query_param)
+        )
+        key = hashlib.md5(
+            f'{request.path}:{request.user.pk}:{params}'.encode()
+        ).hexdigest()
+        return cache.get_or_set(
+            f'recipe_count:{key}',
+            lambda: queryset.order_by().count(),
+            settings.RECIPE_COUNT_CACHE_TIMEOUT,
+        )
+
+
+class FeedPagination(RecipePagination):
+    ordering = ('-feed_date', '-feed_recipe')
+
+    def is_cursor_mode(self, request):
+        return True
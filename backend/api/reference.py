@@ -0,0 +1,76 @@
+import gzip
+import json
+import threading
+
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from recipes.models import Ingredient, Tag
+from recipes.versions import get_version
+
+from api.serializers import IngredientSerializer, TagSerializer
+
+
+class ReferenceSnapshot:
+
+    def __init__(self, name, queryset, serializer_class):
+        self.name = name
+        self.queryset = queryset
+        self.serializer_class = serializer_class
+        self.lock = threading.Lock()
+        self.version = None
+        self.snapshot = None
+
+    def get(self):
+        version = get_version(self.name)
+        if self.version != version:
+            with self.lock:
+                if self.version != version:
+                    self.snapshot = self.build(version)
+                    self.version = version
+        return self.snapshot
+
+    def build(self, version):
+        data = self.serializer_class(self.queryset.all(), many=True).data
+        body = json.dumps(
+            data, ensure_ascii=False, separators=(',', ':')).encode()
+        return {
+            'body': body,
+            'gzipped': gzip.compress(body),
+            'etag': f'"{self.name}-{int(version * 1000)}"',
+            'last_modified': int(version),
+            'version': version,
+        }
+
+    def check_conditions(self, request):
+        snapshot = self.get()
+        return snapshot, get_conditional_response(
+            request,
+            etag=snapshot['etag'],
+            last_modified=snapshot['last_modified'],
+        )
+
+    def response(self, request):
+        snapshot, not_modified = self.check_conditions(request)
+        if not_modified is not None:
+            return self.add_headers(not_modified, snapshot)
+        accepts_gzip = 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '')
+        response = HttpResponse(
+            snapshot['gzipped'] if accepts_gzip else snapshot['body'],
+            content_type='application/json',
+        )
+        if accepts_gzip:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return self.add_headers(response, snapshot)
+
+    @staticmethod
+    def add_headers(response, snapshot):
+        response['ETag'] = snapshot['etag']
+        response['Last-Modified'] = http_date(snapshot['last_modified'])
+        return response
+
+
+tags_snapshot = ReferenceSnapshot('tags', Tag.objects.all(), TagSerializer)
+ingredients_snapshot = ReferenceSnapshot(
+    'ingredients', Ingredient.objects.all(), IngredientSerializer)
@@ -0,0 +1,31 @@
+from rest_framework.renderers import JSONRenderer
+
+
+class ShoppingListRenderer(JSONRenderer):
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = 'application/json'
+        return super().render(data, 'application/json', renderer_context)
+
+
+class PDFRenderer(ShoppingListRenderer):
+    media_type = 'application/pdf'
+    format = 'pdf'
+
+
+class TextRenderer(ShoppingListRenderer):
+    media_type = 'text/plain'
+    format = 'txt'
+
+
+class CSVRenderer(ShoppingListRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+
+class JSONStreamRenderer(ShoppingListRenderer):
+    media_type = 'application/json'
+    format = 'json'
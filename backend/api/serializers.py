@@ -1,10 +1,17 @@
+import json
+
+from django.conf import settings
 from django.core.validators import MinValueValidator
-from drf_extra_fields.fields import Base64ImageField
+from django.db import transaction
+from recipes import images, shopping_list
 from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
                             ShopCart, Tag)
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from users.serializers import CustomUserSerializer
+from rest_framework.utils import html
+from api.fields import (BulkPrimaryKeyRelatedField, ImageVariantsField,
+                        RecipeImageField, resolve_ids)
+from users.serializers import AuthorListSerializer, CustomUserSerializer
 from users.models import User
 
 
@@ -62,50 +69,133 @@ class FavoriteSerializer(serializers.ModelSerializer):
         )
 
 
+class BulkRecipesSerializer(serializers.Serializer):
+    recipes = BulkPrimaryKeyRelatedField(
+        many=True,
+        queryset=Recipe.objects.only('id'),
+        max_length=settings.BULK_ACTION_MAX_ITEMS,
+    )
+
+    def validate_recipes(self, recipes):
+        return list(dict.fromkeys(recipe.id for recipe in recipes))
+
+
+class RecipeListSerializer(AuthorListSerializer):
+    author_field = 'author_id'
+
+    def has_authors(self):
+        return 'author' in self.child.fields
+
+
 class ListRecipeSerializer(serializers.ModelSerializer):
+    presets = {
+        'card': ('id', 'name', 'image', 'image_variants', 'cooking_time'),
+    }
     tags = TagSerializer(many=True, read_only=True)
     author = CustomUserSerializer(read_only=True)
     ingredients = IngredientAmountSerializer(
         source='recipe_shop',
         many=True
     )
-    is_favorited = serializers.SerializerMethodField()
-    is_in_shopping_cart = serializers.SerializerMethodField()
+    image_variants = ImageVariantsField()
+    is_favorited = serializers.BooleanField(read_only=True, default=False)
+    is_in_shopping_cart = serializers.BooleanField(
+        read_only=True, default=False)
 
     class Meta:
         model = Recipe
-        fields = '__all__'
+        fields = (
+            'id',
+            'tags',
+            'author',
+            'ingredients',
+            'image_variants',
+            'is_favorited',
+            'is_in_shopping_cart',
+            'name',
+            'image',
+            'text',
+            'cooking_time',
+            'created_date',
+            'favorites_count',
+            'cart_count',
+        )
+        list_serializer_class = RecipeListSerializer
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.context.get('fields')
+        if selected is not None:
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+    @classmethod
+    def select_fields(cls, query_params):
+        requested = cls.parse_fields(query_params, 'fields')
+        omitted = cls.parse_fields(query_params, 'omit')
+        if requested is None and omitted is None:
+            return None
+        selected = set(requested or cls.Meta.fields)
+        return selected - set(omitted or ())
+
+    @classmethod
+    def parse_fields(cls, query_params, param):
+        value = query_params.get(param)
+        if value is None:
+            return None
+        names = []
+        for name in filter(None, (name.strip() for name in value.split(','))):
+            if name == 'full':
+                names.extend(cls.Meta.fields)
+            else:
+                names.extend(cls.presets.get(name, (name,)))
+        unknown = sorted(set(names) - set(cls.Meta.fields))
+        if unknown:
+            raise ValidationError(
+                {param: f'Неизвестные поля: {", ".join(unknown)}'})
+        return names
 
-    def get_is_favorited(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return Favorite.objects.filter(
-            recipe=obj,
-            user=user
-        ).exists()
-
-    def get_is_in_shopping_cart(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return ShopCart.objects.filter(
-            recipe=obj,
-            user=user
-        ).exists()
+
+class AddRecipeIngredientsListSerializer(serializers.ListSerializer):
+    def get_value(self, dictionary):
+        if html.is_html_input(dictionary) and self.field_name in dictionary:
+            try:
+                return json.loads(dictionary[self.field_name])
+            except ValueError:
+                return dictionary[self.field_name]
+        return super().get_value(dictionary)
+
+    def to_internal_value(self, data):
+        ingredients = super().to_internal_value(data)
+        resolved = resolve_ids(
+            Ingredient.objects.all(),
+            [ingredient['id'] for ingredient in ingredients]
+        )
+        for ingredient, obj in zip(ingredients, resolved):
+            ingredient['id'] = obj
+        return ingredients
 
 
 class AddRecipeIngredientsSerializer(serializers.ModelSerializer):
-    id = serializers.PrimaryKeyRelatedField(queryset=Ingredient.objects.all())
+    id = serializers.IntegerField()
     amount = serializers.IntegerField(min_value=1)
 
     class Meta:
         model = IngredientAmount
+        list_serializer_class = AddRecipeIngredientsListSerializer
         fields = ('id',
                   'amount'
                   )
 
 
+class RecipeImageSerializer(serializers.ModelSerializer):
+    image = RecipeImageField()
+
+    class Meta:
+        model = Recipe
+        fields = ('image',)
+
+
 class CreateRecipeSerializer(serializers.ModelSerializer):
     name = serializers.CharField(required=False)
     text = serializers.CharField(required=False)
@@ -113,10 +203,10 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
     ingredients = AddRecipeIngredientsSerializer(
         many=True,
     )
-    tags = serializers.PrimaryKeyRelatedField(
+    tags = BulkPrimaryKeyRelatedField(
         many=True, queryset=Tag.objects.all())
     cooking_time = serializers.IntegerField()
-    image = Base64ImageField()
+    image = RecipeImageField()
 
     class Meta:
         model = Recipe
@@ -138,32 +228,68 @@ class CreateRecipeSerializer(serializers.ModelSerializer):
         return cooking_time
 
     @staticmethod
-    def add_recipe_ingredients_tags(recipe, ingredients, tags):
-        for ingredient in ingredients:
-            IngredientAmount.objects.create(
+    def add_recipe_ingredients(recipe, ingredients):
+        IngredientAmount.objects.bulk_create(
+            IngredientAmount(
                 recipe=recipe,
                 ingredient=ingredient['id'],
                 amount=ingredient['amount']
             )
-        for tag in tags:
-            recipe.tags.add(tag)
+            for ingredient in ingredients
+        )
 
+    @staticmethod
+    def update_recipe_ingredients(recipe, ingredients):
+        current = {
+            row.ingredient_id: row
+            for row in IngredientAmount.objects.filter(recipe=recipe)
+        }
+        old_amounts = {
+            ingredient_id: row.amount for ingredient_id, row in current.items()
+        }
+        new_amounts = {
+            ingredient['id'].id: ingredient['amount']
+            for ingredient in ingredients
+        }
+        IngredientAmount.objects.filter(
+            recipe=recipe,
+            ingredient_id__in=old_amounts.keys() - new_amounts.keys()
+        ).delete()
+        CreateRecipeSerializer.add_recipe_ingredients(recipe, (
+            ingredient for ingredient in ingredients
+            if ingredient['id'].id not in current
+        ))
+        changed = []
+        for ingredient_id, row in current.items():
+            if new_amounts.get(ingredient_id, row.amount) != row.amount:
+                row.amount = new_amounts[ingredient_id]
+                changed.append(row)
+        IngredientAmount.objects.bulk_update(changed, ['amount'])
+        return old_amounts, new_amounts
+
+    @transaction.atomic
     def create(self, validated_data):
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
         recipe = Recipe.objects.create(
             author=self.context.get('request').user, **validated_data
         )
-        self.add_recipe_ingredients_tags(recipe, ingredients, tags)
+        self.add_recipe_ingredients(recipe, ingredients)
+        recipe.tags.set(tags)
+        images.schedule_variants(recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, recipe, validated_data):
-        recipe.tags.clear()
-        IngredientAmount.objects.filter(recipe=recipe).delete()
         ingredients = validated_data.pop('ingredients')
-        tags = validated_data.pop('tags')
-        self.add_recipe_ingredients_tags(recipe, ingredients, tags)
-        return super().update(recipe, validated_data)
+        recipe.tags.set(validated_data.pop('tags'))
+        old_amounts, new_amounts = self.update_recipe_ingredients(
+            recipe, ingredients)
+        shopping_list.update_recipe(recipe.id, old_amounts, new_amounts)
+        recipe = super().update(recipe, validated_data)
+        if 'image' in validated_data:
+            images.schedule_variants(recipe)
+        return recipe
 
     def validate(self, attrs):
         unique_ingredients = set()
@@ -0,0 +1,123 @@
+import csv
+import json
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import FileResponse, StreamingHttpResponse
+from reportlab.lib.pagesizes import A4
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+FONT_NAME = 'FreeSans'
+FONT_PATH = os.path.join(settings.BASE_DIR, 'media', 'fonts', 'FreeSans.ttf')
+SPOOL_MAX_SIZE = 1024 * 1024
+TOP = 800
+BOTTOM = 50
+LINE_HEIGHT = 25
+
+
+@lru_cache(maxsize=None)
+def register_font():
+    pdfmetrics.registerFont(TTFont(FONT_NAME, FONT_PATH))
+
+
+class ShoppingListPDF:
+    title = 'Список покупок'
+
+    def __init__(self, output, subtitle):
+        register_font()
+        self.pdf = canvas.Canvas(output, pagesize=A4)
+        self.subtitle = subtitle
+        self.height = None
+
+    def draw_header(self):
+        self.pdf.setFont(FONT_NAME, 24)
+        self.pdf.drawCentredString(300, 770, self.title)
+        self.pdf.setFont(FONT_NAME, 16)
+        self.pdf.drawCentredString(290, 720, self.subtitle)
+        self.pdf.line(30, 710, 565, 710)
+        self.height = 670
+
+    def new_page(self):
+        self.pdf.showPage()
+        self.pdf.setFont(FONT_NAME, 16)
+        self.height = TOP
+
+    def draw_line(self, text):
+        if self.height < BOTTOM:
+            self.new_page()
+        self.pdf.drawString(50, self.height, text)
+        self.height -= LINE_HEIGHT
+
+    def render(self, ingredients):
+        self.draw_header()
+        for name, measurement_unit, amount in ingredients:
+            self.draw_line(f'{name} - {amount} {measurement_unit}')
+        self.pdf.showPage()
+        self.pdf.save()
+
+
+def render_pdf(ingredients, subtitle, output):
+    ShoppingListPDF(output, subtitle).render(ingredients)
+
+
+def pdf_response(ingredients, subtitle, filename='shopping-list.pdf'):
+    output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    render_pdf(ingredients, subtitle, output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=filename,
+        content_type='application/pdf',
+    )
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def txt_lines(ingredients):
+    for name, measurement_unit, amount in ingredients:
+        yield f'{name} - {amount} {measurement_unit}\n'
+
+
+def csv_lines(ingredients):
+    writer = csv.writer(Echo())
+    yield writer.writerow(('name', 'measurement_unit', 'amount'))
+    for row in ingredients:
+        yield writer.writerow(row)
+
+
+def json_lines(ingredients):
+    separator = '['
+    for name, measurement_unit, amount in ingredients:
+        yield separator + json.dumps({
+            'name': name,
+            'measurement_unit': measurement_unit,
+            'amount': amount,
+        }, ensure_ascii=False)
+        separator = ','
+    yield ']' if separator == ',' else '[]'
+
+
+STREAM_FORMATS = {
+    'txt': (txt_lines, 'text/plain; charset=utf-8'),
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'json': (json_lines, 'application/json; charset=utf-8'),
+}
+
+
+def shopping_list_response(ingredients, file_format, subtitle):
+    if file_format not in STREAM_FORMATS:
+        return pdf_response(ingredients, subtitle)
+    lines, content_type = STREAM_FORMATS[file_format]
+    response = StreamingHttpResponse(
+        lines(ingredients), content_type=content_type)
+    response['Content-Disposition'] = (
+        f'attachment; filename="shopping-list.{file_format}"')
+    return response
@@ -0,0 +1,74 @@
+import uuid
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.parsers import FileUploadParser
+
+IMAGE_FORMATS = {
+    'JPEG': 'jpg',
+    'PNG': 'png',
+    'GIF': 'gif',
+    'WEBP': 'webp',
+}
+
+
+class ImageTooLarge(APIException):
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_detail = 'Размер картинки превышает допустимый.'
+    default_code = 'image_too_large'
+
+
+class MaxSizeUploadHandler(FileUploadHandler):
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.received = 0
+
+    def handle_raw_input(self, input_data, meta, content_length, boundary,
+                         encoding=None):
+        max_request_size = (
+            settings.RECIPE_IMAGE_MAX_SIZE
+            + settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        )
+        if content_length and content_length > max_request_size:
+            raise ImageTooLarge()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.RECIPE_IMAGE_MAX_SIZE:
+            raise ImageTooLarge()
+        return raw_data
+
+    def file_complete(self, file_size):
+        return None
+
+
+class ImageUploadParser(FileUploadParser):
+    media_type = 'image/*'
+
+    def get_filename(self, stream, media_type, parser_context):
+        return super().get_filename(
+            stream, media_type, parser_context) or 'image'
+
+
+def validate_image_file(file):
+    if file.size > settings.RECIPE_IMAGE_MAX_SIZE:
+        raise ImageTooLarge()
+    try:
+        image = Image.open(file)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        raise ValidationError('Загрузите корректное изображение.')
+    if image.format not in IMAGE_FORMATS:
+        raise ValidationError('Неподдерживаемый формат изображения.')
+    max_width, max_height = settings.RECIPE_IMAGE_MAX_DIMENSIONS
+    width, height = image.size
+    if width > max_width or height > max_height:
+        raise ValidationError(
+            f'Размер изображения не должен превышать '
+            f'{max_width}x{max_height} пикселей.'
+        )
+    file.seek(0)
+    file.name = f'{uuid.uuid4()}.{IMAGE_FORMATS[image.format]}'
+    return file
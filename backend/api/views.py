@@ -1,22 +1,29 @@
-from django.db.models import Sum
-from django.http import HttpResponse
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, Exists, OuterRef, Prefetch, Value
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
+from django.utils.functional import cached_property
 from django_filters.rest_framework import DjangoFilterBackend
+from recipes import bulk, feed, images
 from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
-                            ShopCart, Tag)
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
+                            ShopCart, ShopCartIngredient, Tag)
+from recipes.search import ingredient_index
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from api.pagination import CustomPagination
-from api.serializers import (CreateRecipeSerializer, FavoriteSerializer,
-                             IngredientSerializer, ListRecipeSerializer,
+from api.pagination import FeedPagination, RecipePagination
+from api.serializers import (BulkRecipesSerializer, CreateRecipeSerializer,
+                             FavoriteSerializer, IngredientSerializer,
+                             ListRecipeSerializer, RecipeImageSerializer,
                              ShopCartSerializer, TagSerializer)
-from .filters import CustomRecipeFilter, IngredientFilter
+from api.reference import ingredients_snapshot, tags_snapshot
+from api.renderers import (CSVRenderer, JSONStreamRenderer, PDFRenderer,
+                           TextRenderer)
+from api.shopping_list import shopping_list_response
+from api.uploads import ImageUploadParser, MaxSizeUploadHandler
+from .filters import CustomRecipeFilter
 from .mixins import CreateOrListViewSet
 from .permissions import IsAuthorOrAdminOrReadOnly
 
@@ -27,15 +34,26 @@ class TagViewSet(CreateOrListViewSet):
     permission_classes = [AllowAny, ]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        return tags_snapshot.response(request)
+
 
 class IngredientViewSet(CreateOrListViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
-    filter_backends = (DjangoFilterBackend,)
-    filterset_class = IngredientFilter
     permission_classes = [IsAuthorOrAdminOrReadOnly, ]
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name', '')
+        if not name:
+            return ingredients_snapshot.response(request)
+        snapshot, response = ingredients_snapshot.check_conditions(request)
+        if response is None:
+            response = Response(ingredient_index.search(
+                name, version=snapshot['version']))
+        return ingredients_snapshot.add_headers(response, snapshot)
+
 
 class RecipeViewSet(viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
@@ -43,15 +61,77 @@ class RecipeViewSet(viewsets.ModelViewSet):
         IsAuthorOrAdminOrReadOnly,
     ]
     serializer_class = CreateRecipeSerializer
-    pagination_class = CustomPagination
+    pagination_class = RecipePagination
+    lookup_value_regex = r'\d+'
     filter_backends = (DjangoFilterBackend,)
     filterset_class = CustomRecipeFilter
+    parser_classes = (JSONParser, MultiPartParser, FormParser)
+
+    def initialize_request(self, request, *args, **kwargs):
+        request.upload_handlers.insert(0, MaxSizeUploadHandler(request))
+        return super().initialize_request(request, *args, **kwargs)
+
+    @cached_property
+    def response_fields(self):
+        if self.request.method != 'GET':
+            return None
+        return ListRecipeSerializer.select_fields(self.request.query_params)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.response_fields
+        return context
+
+    def get_queryset(self):
+        user = self.request.user
+        fields = self.response_fields or ListRecipeSerializer.Meta.fields
+        queryset = Recipe.objects.defer('search_vector')
+        if 'author' in fields:
+            queryset = queryset.select_related('author')
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
+        if 'ingredients' in fields:
+            queryset = queryset.prefetch_related(Prefetch(
+                'recipe_shop',
+                queryset=IngredientAmount.objects.select_related('ingredient')
+            ))
+        if 'text' not in fields:
+            queryset = queryset.defer('text')
+        for name, model in (
+            ('is_favorited', Favorite), ('is_in_shopping_cart', ShopCart)
+        ):
+            if name not in fields and name not in self.request.query_params:
+                continue
+            if user.is_anonymous:
+                flag = Value(False, output_field=BooleanField())
+            else:
+                flag = Exists(model.objects.filter(
+                    user=user, recipe=OuterRef('pk')))
+            queryset = queryset.annotate(**{name: flag})
+        return queryset
 
     def get_serializer_class(self):
         if self.request.method == 'POST' or self.request.method == 'PATCH':
             return CreateRecipeSerializer
         return ListRecipeSerializer
 
+    @action(
+        detail=True,
+        methods=['PUT'],
+        url_path='image',
+        parser_classes=[ImageUploadParser],
+    )
+    def image(self, request, pk=None):
+        recipe = self.get_object()
+        serializer = RecipeImageSerializer(
+            recipe, data={'image': request.data.get('file')})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        images.schedule_variants(recipe)
+        serializer = ListRecipeSerializer(
+            recipe, context={'request': request})
+        return Response(serializer.data)
+
     @action(
         detail=True,
         methods=['POST', 'DELETE'],
@@ -59,27 +139,12 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def shopcart(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, id=pk)
-        user = request.user
         if request.method == 'POST':
-            if ShopCart.objects.filter(user=user, recipe=recipe).exists():
-                return Response(
-                    {'error': 'Этот рецепт уже добавлен в корзину'},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-            shop_cart = ShopCart.objects.create(user=user, recipe=recipe)
-            serializer = ShopCartSerializer(
-                shop_cart, context={'request': request}
+            return self.add_relation(
+                request, pk, ShopCart, ShopCartSerializer,
+                'Этот рецепт уже добавлен в корзину',
             )
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-        if request.method == 'DELETE':
-            delete_shop_cart = ShopCart.objects.filter(
-                user=user, recipe=recipe)
-            if delete_shop_cart.exists():
-                delete_shop_cart.delete()
-                return Response(status=status.HTTP_204_NO_CONTENT)
-            return Response(status=status.HTTP_400_BAD_REQUEST)
+        return self.remove_relation(request, pk, ShopCart)
 
     @action(
         detail=True,
@@ -88,67 +153,95 @@ class RecipeViewSet(viewsets.ModelViewSet):
         permission_classes=[IsAuthenticated],
     )
     def favorite(self, request, pk=None):
-        recipe = get_object_or_404(Recipe, id=pk)
-        user = request.user
-        method = request.method
-        if method == 'POST':
-            favorite = Favorite.objects.create(user=user, recipe=recipe)
-            serializer = FavoriteSerializer(
-                favorite, context={'request': request})
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
-
-        if method == 'DELETE':
-            favorite = Favorite.objects.filter(user=user, recipe=recipe)
-            if favorite.exists():
-                favorite.delete()
-                return Response(status=status.HTTP_204_NO_CONTENT)
+        if request.method == 'POST':
+            return self.add_relation(
+                request, pk, Favorite, FavoriteSerializer,
+                'Этот рецепт уже добавлен в избранное',
+            )
+        return self.remove_relation(request, pk, Favorite)
+
+    @action(
+        detail=False,
+        methods=['GET'],
+        permission_classes=[IsAuthenticated],
+        pagination_class=FeedPagination,
+    )
+    def feed(self, request):
+        queryset = feed.recipes_for(
+            self.filter_queryset(self.get_queryset()), request.user)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=['POST', 'DELETE'],
+        url_path='bulk_shopping_cart',
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_shopcart(self, request):
+        return self.bulk_relation(request, 'cart')
+
+    @action(
+        detail=False,
+        methods=['POST', 'DELETE'],
+        url_path='bulk_favorite',
+        permission_classes=[IsAuthenticated],
+    )
+    def bulk_favorite(self, request):
+        return self.bulk_relation(request, 'favorites')
+
+    @staticmethod
+    def add_relation(request, pk, model, serializer_class, error):
+        recipe = get_object_or_404(Recipe.objects.only('id'), id=pk)
+        try:
+            with transaction.atomic():
+                relation = model.objects.create(
+                    user=request.user, recipe_id=recipe.id)
+        except IntegrityError:
+            return Response(
+                {'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        serializer = serializer_class(relation, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @staticmethod
+    def remove_relation(request, pk, model):
+        deleted, _ = model.objects.filter(
+            user=request.user, recipe_id=pk).delete()
+        if not deleted:
+            get_object_or_404(Recipe, id=pk)
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def bulk_relation(request, relation):
+        serializer = BulkRecipesSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        recipe_ids = serializer.validated_data['recipes']
+        if request.method == 'POST':
+            bulk.add_recipes(relation, request.user.id, recipe_ids)
+            return Response(
+                {'recipes': recipe_ids}, status=status.HTTP_201_CREATED)
+        bulk.remove_recipes(relation, request.user.id, recipe_ids)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
     @action(
         detail=False,
         methods=['GET'],
         url_path='download_shopping_cart',
         permission_classes=[IsAuthenticated],
+        renderer_classes=[
+            PDFRenderer, TextRenderer, CSVRenderer, JSONStreamRenderer],
     )
     def shop_cart(self, request):
-        user = request.user
-        all_count_ingredients = (
-            IngredientAmount.objects.filter(
-                recipe__list_recipe__user=user)
-            .values('ingredient__name', 'ingredient__measurement_unit')
-            .annotate(amount=Sum('amount'))
+        ingredients = (
+            ShopCartIngredient.objects.filter(user=request.user)
+            .order_by('ingredient__name')
+            .values_list(
+                'ingredient__name', 'ingredient__measurement_unit', 'amount')
+        )
+        return shopping_list_response(
+            ingredients.iterator(),
+            request.accepted_renderer.format,
+            f'{timezone.now().date()}',
         )
-        shop_list = {}
-        for ingredient in all_count_ingredients:
-            amount = ingredient['amount']
-            name = ingredient['ingredient__name']
-            measurement_unit = ingredient['ingredient__measurement_unit']
-            shop_list[name] = {
-                'amount': amount,
-                'measurement_unit': measurement_unit}
-        sub_title = f'{timezone.now().date()}'
-        response = HttpResponse(content_type='application/pdf')
-        content_disposition = 'attachment; filename="shopping-list.pdf"'
-        response['Content-Disposition'] = content_disposition
-        pdf = canvas.Canvas(response)
-        pdfmetrics.registerFont(TTFont
-                                (
-                                    'FreeSans',
-                                    'media/fonts/FreeSans.ttf')
-                                )
-        pdf.setFont('FreeSans', 24)
-        pdf.drawCentredString(300, 770, 'Список покупок')
-        pdf.setFont('FreeSans', 16)
-        pdf.drawCentredString(290, 720, sub_title)
-        pdf.line(30, 710, 565, 710)
-        height = 670
-        for name, data in shop_list.items():
-            pdf.drawString(
-                50,
-                height,
-                f"{name} - {data['amount']} {data['measurement_unit']}"
-            )
-            height -= 25
-        pdf.showPage()
-        pdf.save()
-        return response
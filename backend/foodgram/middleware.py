@@ -0,0 +1,136 @@
+import json
+import logging
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger('foodgram.slow_requests')
+
+TOP_STATEMENTS = 5
+STATEMENT_PREVIEW = 500
+
+
+class RequestProfile:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.view_started = None
+        self.view_finished = None
+        self.render_started = None
+        self.render_finished = None
+        self.sql_time = 0
+        self.view_sql_time = 0
+        self.statements = defaultdict(lambda: [0, 0])
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.sql_time += elapsed
+            if self.view_started is not None and self.view_finished is None:
+                self.view_sql_time += elapsed
+            statement = self.statements[sql]
+            statement[0] += 1
+            statement[1] += elapsed
+
+    @property
+    def query_count(self):
+        return sum(count for count, _ in self.statements.values())
+
+    def repeated(self):
+        return sorted(
+            (
+                (sql, count, elapsed)
+                for sql, (count, elapsed) in self.statements.items()
+                if count > 1
+            ),
+            key=lambda statement: (-statement[1], -statement[2]),
+        )
+
+    def timings(self, finished):
+        timings = {
+            'total': finished - self.started,
+            'sql': self.sql_time,
+        }
+        if self.view_started is not None:
+            view_finished = self.view_finished or finished
+            timings['app'] = max(
+                view_finished - self.view_started - self.view_sql_time, 0)
+        if self.render_started is not None:
+            timings['render'] = (
+                (self.render_finished or finished) - self.render_started)
+        return timings
+
+
+class SQLProfilingMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.SQL_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        request._sql_profile = profile
+        with connection.execute_wrapper(profile):
+            response = self.get_response(request)
+        finished = time.perf_counter()
+        timings = profile.timings(finished)
+        repeated = profile.repeated()
+        descriptions = {
+            'sql': f'{profile.query_count} queries, '
+                   f'{len(repeated)} repeated',
+            'app': 'views and serializers without SQL',
+        }
+        response['Server-Timing'] = ', '.join(
+            f'{name};dur={elapsed * 1000:.1f}'
+            + (f';desc="{descriptions[name]}"'
+               if name in descriptions else '')
+            for name, elapsed in timings.items()
+        )
+        if (timings['total'] * 1000 >= settings.SQL_PROFILING_SLOW_MS
+                or profile.query_count
+                >= settings.SQL_PROFILING_SLOW_QUERIES):
+            self.log_slow_request(request, response, profile, timings,
+                                  repeated)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._sql_profile.view_started = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        profile = request._sql_profile
+        profile.view_finished = profile.render_started = time.perf_counter()
+
+        def finish_render(response):
+            profile.render_finished = time.perf_counter()
+
+        response.add_post_render_callback(finish_render)
+        return response
+
+    @staticmethod
+    def log_slow_request(request, response, profile, timings, repeated):
+        logger.warning(json.dumps({
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'user': request.user.pk if hasattr(request, 'user') else None,
+            'queries': profile.query_count,
+            'timings_ms': {
+                name: round(elapsed * 1000, 1)
+                for name, elapsed in timings.items()
+            },
+            'repeated': [
+                {
+                    'sql': sql[:STATEMENT_PREVIEW],
+                    'count': count,
+                    'ms': round(elapsed * 1000, 1),
+                }
+                for sql, count, elapsed in repeated[:TOP_STATEMENTS]
+            ],
+        }, ensure_ascii=False))
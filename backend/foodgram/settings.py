@@ -23,12 +23,13 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'djoser',
     'django_filters',
-    'recipes',
-    'users',
+    'recipes.apps.RecipesConfig',
+    'users.apps.UsersConfig',
     'api',
 ]
 
 MIDDLEWARE = [
+    'foodgram.middleware.SQLProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -104,7 +105,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "users.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
@@ -113,6 +114,45 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 6,
 }
 
+INGREDIENT_SEARCH_LIMIT = int(os.getenv('INGREDIENT_SEARCH_LIMIT', default=50))
+
+REFERENCE_VERSION_TIMEOUT = int(
+    os.getenv('REFERENCE_VERSION_TIMEOUT', default=5))
+
+RECIPE_COUNT_CACHE_TIMEOUT = 60
+
+RECIPE_SEARCH_CONFIG = os.getenv('RECIPE_SEARCH_CONFIG', default='simple')
+
+ADMIN_COUNT_ESTIMATE_THRESHOLD = 100000
+
+BULK_ACTION_MAX_ITEMS = 100
+
+TOKEN_AUTH_CACHE_SIZE = int(os.getenv('TOKEN_AUTH_CACHE_SIZE', default=10000))
+TOKEN_AUTH_CACHE_TIMEOUT = int(
+    os.getenv('TOKEN_AUTH_CACHE_TIMEOUT', default=300))
+TOKEN_AUTH_CACHE_ALIAS = os.getenv('TOKEN_AUTH_CACHE_ALIAS') or None
+TOKEN_AUTH_CACHE_LOCAL_TIMEOUT = int(
+    os.getenv('TOKEN_AUTH_CACHE_LOCAL_TIMEOUT', default=5))
+TOKEN_AUTH_CACHE_SINGLE_PROCESS = os.getenv(
+    'TOKEN_AUTH_CACHE_SINGLE_PROCESS', default='False') == 'True'
+TOKEN_AUTH_CACHE_STATS_EVERY = int(
+    os.getenv('TOKEN_AUTH_CACHE_STATS_EVERY', default=10000))
+
+SQL_PROFILING = os.getenv('SQL_PROFILING', default='False') == 'True'
+SQL_PROFILING_SLOW_MS = int(os.getenv('SQL_PROFILING_SLOW_MS', default=500))
+SQL_PROFILING_SLOW_QUERIES = int(
+    os.getenv('SQL_PROFILING_SLOW_QUERIES', default=30))
+
+RECIPE_IMAGE_VARIANTS = {
+    'thumbnail': (320, 320),
+    'card': (800, 800),
+}
+RECIPE_IMAGE_QUALITY = 80
+RECIPE_IMAGE_WORKERS = int(os.getenv('RECIPE_IMAGE_WORKERS', default=2))
+RECIPE_IMAGE_MAX_SIZE = int(
+    os.getenv('RECIPE_IMAGE_MAX_SIZE', default=10 * 1024 * 1024))
+RECIPE_IMAGE_MAX_DIMENSIONS = (6000, 6000)
+
 DJOSER = {
     "LOGIN_FIELD": "email",
     "PASSWORD_RESET_CONFIRM_URL": "#/password/reset/confirm/{uid}/{token}",
@@ -0,0 +1,44 @@
+from django.db import connection, transaction
+
+from recipes import counters, shopping_list
+from recipes.models import Favorite, ShopCart
+
+RELATIONS = {
+    'favorites': (Favorite, 'favorites_count'),
+    'cart': (ShopCart, 'cart_count'),
+}
+
+
+def add_recipes(relation, user_id, recipe_ids):
+    model, _ = RELATIONS[relation]
+    with transaction.atomic():
+        model.objects.bulk_create(
+            [model(user_id=user_id, recipe_id=pk) for pk in recipe_ids],
+            ignore_conflicts=True,
+        )
+        refresh(relation, user_id, recipe_ids)
+
+
+def remove_recipes(relation, user_id, recipe_ids):
+    if not recipe_ids:
+        return
+    model, _ = RELATIONS[relation]
+    with transaction.atomic():
+        # Удаляем без ORM, чтобы не вызывать сигналы на каждую строку:
+        # счётчики и список покупок пересчитываются ниже одним запросом
+        # на каждый, а на избранное и корзину никто не ссылается.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {model._meta.db_table} '
+                f'WHERE user_id = %s AND recipe_id IN '
+                f'({", ".join(["%s"] * len(recipe_ids))})',
+                [user_id, *recipe_ids],
+            )
+        refresh(relation, user_id, recipe_ids)
+
+
+def refresh(relation, user_id, recipe_ids):
+    _, counter = RELATIONS[relation]
+    counters.recount_recipes(recipe_ids, (counter,))
+    if relation == 'cart':
+        shopping_list.rebuild_users([user_id])
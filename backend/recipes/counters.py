@@ -0,0 +1,93 @@
+from collections import Counter
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from recipes.models import AuthorStats, Favorite, Recipe, ShopCart
+
+BATCH_SIZE = 1000
+RECIPE_COUNTERS = (
+    ('favorites_count', Favorite),
+    ('cart_count', ShopCart),
+)
+
+
+def change_counter(queryset, field, delta):
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def change_recipe_counter(recipe_ids, field, delta):
+    change_counter(Recipe.objects.filter(pk__in=recipe_ids), field, delta)
+
+
+def change_recipes_count(author_id, delta):
+    stats = AuthorStats.objects.filter(user_id=author_id)
+    if not change_counter(stats, 'recipes_count', delta) and delta > 0:
+        AuthorStats.objects.bulk_create(
+            [AuthorStats(user_id=author_id)], ignore_conflicts=True)
+        change_counter(stats, 'recipes_count', delta)
+
+
+def live_counts(model, field):
+    return Counter(dict(
+        model.objects.values_list(field).annotate(total=Count('pk'))
+        .order_by()
+    ))
+
+
+def recipe_mismatches():
+    live = {
+        field: live_counts(model, 'recipe_id')
+        for field, model in RECIPE_COUNTERS
+    }
+    fields = [field for field, _ in RECIPE_COUNTERS]
+    mismatches = []
+    for recipe_id, *stored in Recipe.objects.values_list(
+            'id', *fields).iterator():
+        expected = [live[field][recipe_id] for field in fields]
+        if expected != stored:
+            mismatches.append((recipe_id, dict(zip(fields, expected))))
+    return mismatches
+
+
+def author_mismatches():
+    live = live_counts(Recipe, 'author_id')
+    stored = dict(AuthorStats.objects.values_list('user_id', 'recipes_count'))
+    return [
+        (author_id, live[author_id], stored.get(author_id, 0))
+        for author_id in live.keys() | stored.keys()
+        if live[author_id] != stored.get(author_id, 0)
+    ]
+
+
+def count_subquery(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by()
+        .values(field).annotate(total=Count('pk')).values('total')
+    ), 0)
+
+
+def recount_recipes(recipe_ids, fields=None):
+    recipe_ids = list(recipe_ids)
+    for start in range(0, len(recipe_ids), BATCH_SIZE):
+        Recipe.objects.filter(
+            pk__in=recipe_ids[start:start + BATCH_SIZE]
+        ).update(**{
+            field: count_subquery(model, 'recipe')
+            for field, model in RECIPE_COUNTERS
+            if fields is None or field in fields
+        })
+
+
+def reconcile(recipe_ids, author_ids):
+    recount_recipes(recipe_ids)
+    for start in range(0, len(author_ids), BATCH_SIZE):
+        chunk = author_ids[start:start + BATCH_SIZE]
+        AuthorStats.objects.bulk_create(
+            [AuthorStats(user_id=author_id) for author_id in chunk],
+            ignore_conflicts=True,
+        )
+        AuthorStats.objects.filter(pk__in=chunk).update(
+            recipes_count=count_subquery(Recipe, 'author'))
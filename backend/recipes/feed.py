@@ -0,0 +1,82 @@
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Q
+from users.models import Follow
+
+from recipes.models import FeedEntry, Recipe
+
+BATCH_SIZE = 1000
+
+
+def bulk_create(entries):
+    entries = iter(entries)
+    while True:
+        batch = list(islice(entries, BATCH_SIZE))
+        if not batch:
+            return
+        FeedEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def recipes_for(queryset, user):
+    return queryset.annotate(
+        feed_entry=FilteredRelation(
+            'feed_entries', condition=Q(feed_entries__user=user)),
+        feed_date=F('feed_entry__created_date'),
+        feed_recipe=F('feed_entry__recipe_id'),
+    ).filter(feed_date__isnull=False)
+
+
+def add_recipe(recipe):
+    bulk_create(
+        FeedEntry(
+            user_id=user_id,
+            recipe_id=recipe.id,
+            created_date=recipe.created_date,
+        )
+        for user_id in Follow.objects.filter(
+            following_id=recipe.author_id
+        ).values_list('user_id', flat=True).iterator()
+    )
+
+
+def add_authors(user_id, author_ids):
+    bulk_create(
+        FeedEntry(
+            user_id=user_id, recipe_id=recipe_id, created_date=created_date)
+        for recipe_id, created_date in Recipe.objects.filter(
+            author_id__in=author_ids
+        ).values_list('id', 'created_date').iterator()
+    )
+
+
+def remove_authors(user_id, author_ids):
+    FeedEntry.objects.filter(
+        user_id=user_id, recipe__author_id__in=author_ids).delete()
+
+
+def live_entries(user_ids=None):
+    follows = Q(author__following__isnull=False)
+    if user_ids is not None:
+        follows = Q(author__following__user_id__in=user_ids)
+    return (
+        Recipe.objects.filter(follows)
+        .values_list('author__following__user_id', 'id', 'created_date')
+        .order_by()
+    )
+
+
+def rebuild(user_ids=None):
+    entries = FeedEntry.objects.all()
+    if user_ids is not None:
+        entries = entries.filter(user_id__in=user_ids)
+    with transaction.atomic():
+        entries.delete()
+        bulk_create(
+            FeedEntry(
+                user_id=user_id, recipe_id=recipe_id,
+                created_date=created_date,
+            )
+            for user_id, recipe_id, created_date
+            in live_entries(user_ids).iterator()
+        )
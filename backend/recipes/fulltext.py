@@ -0,0 +1,115 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections
+from django.db.models import F, Q
+
+from recipes.models import Recipe
+
+MAX_TERMS = 8
+TABLE = Recipe._meta.db_table
+FTS_TABLE = f'{TABLE}_fts'
+
+POSTGRES_SQL = (
+    f'''
+    CREATE OR REPLACE FUNCTION {TABLE}_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector(%(config)s, coalesce(NEW.name, '')), 'A')
+            || setweight(to_tsvector(%(config)s, coalesce(NEW.text, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    f'DROP TRIGGER IF EXISTS {TABLE}_search_vector_trigger ON {TABLE}',
+    f'''
+    CREATE TRIGGER {TABLE}_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, text ON {TABLE}
+    FOR EACH ROW EXECUTE PROCEDURE {TABLE}_search_vector()
+    ''',
+    f'UPDATE {TABLE} SET name = name WHERE search_vector IS NULL',
+    f'CREATE INDEX IF NOT EXISTS recipe_search_vector_idx '
+    f'ON {TABLE} USING gin (search_vector)',
+)
+SQLITE_SQL = (
+    f'''
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, text, content='{TABLE}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 0'
+    )
+    ''',
+    f'''
+    CREATE TRIGGER {FTS_TABLE}_insert AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, text)
+        VALUES (new.id, new.name, new.text);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER {FTS_TABLE}_delete AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+    END
+    ''',
+    f'''
+    CREATE TRIGGER {FTS_TABLE}_update AFTER UPDATE OF name, text ON {TABLE}
+    BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, text)
+        VALUES ('delete', old.id, old.name, old.text);
+        INSERT INTO {FTS_TABLE}(rowid, name, text)
+        VALUES (new.id, new.name, new.text);
+    END
+    ''',
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rank) "
+    f"VALUES ('rank', 'bm25(10.0, 1.0)')",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+)
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_TERMS]
+
+
+def install(using):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            config = settings.RECIPE_SEARCH_CONFIG
+            for statement in POSTGRES_SQL:
+                cursor.execute(statement, {'config': config})
+        elif connection.vendor == 'sqlite':
+            if FTS_TABLE in connection.introspection.table_names(cursor):
+                return
+            for statement in SQLITE_SQL:
+                cursor.execute(statement)
+
+
+def search(queryset, query):
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        search_query = SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            config=settings.RECIPE_SEARCH_CONFIG,
+            search_type='raw',
+        )
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query),
+        ).order_by('-search_rank', '-created_date', '-id')
+    if vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.extra(
+            select={'search_rank': f'-{FTS_TABLE}.rank'},
+            tables=[FTS_TABLE],
+            where=[
+                f'{FTS_TABLE}.rowid = {TABLE}.id',
+                f'{FTS_TABLE} MATCH %s',
+            ],
+            params=[match],
+        ).order_by('-search_rank', '-created_date', '-id')
+    for term in terms:
+        queryset = queryset.filter(
+            Q(name__icontains=term) | Q(text__icontains=term))
+    return queryset
@@ -0,0 +1,91 @@
+import io
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image
+
+from recipes.models import Recipe
+
+logger = logging.getLogger(__name__)
+
+executor = ThreadPoolExecutor(
+    max_workers=settings.RECIPE_IMAGE_WORKERS,
+    thread_name_prefix='recipe-images',
+)
+
+
+def variant_name(name, variant):
+    root, _ = os.path.splitext(name)
+    return f'{root}_{variant}.jpg'
+
+
+def render_variant(image, size):
+    variant = image.copy()
+    variant.thumbnail(size, Image.LANCZOS)
+    output = io.BytesIO()
+    variant.save(
+        output,
+        'JPEG',
+        quality=settings.RECIPE_IMAGE_QUALITY,
+        optimize=True,
+        progressive=True,
+    )
+    return output.getvalue()
+
+
+def generate_variants(name, force=False):
+    variants = {
+        variant: size
+        for variant, size in settings.RECIPE_IMAGE_VARIANTS.items()
+        if force or not default_storage.exists(variant_name(name, variant))
+    }
+    if variants:
+        save_variants(name, variants)
+    Recipe.objects.filter(image=name).update(image_variants_ready=True)
+
+
+def save_variants(name, variants):
+    with default_storage.open(name, 'rb') as file:
+        image = Image.open(file)
+        image.draft('RGB', max(variants.values()))
+        image = image.convert('RGB')
+    for variant, size in variants.items():
+        path = variant_name(name, variant)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        default_storage.save(path, ContentFile(render_variant(image, size)))
+
+
+def generate_variants_safely(name):
+    close_old_connections()
+    try:
+        generate_variants(name)
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', name)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(recipe):
+    if recipe.image_variants_ready:
+        Recipe.objects.filter(pk=recipe.pk).update(image_variants_ready=False)
+        recipe.image_variants_ready = False
+    name = recipe.image.name
+    if name:
+        transaction.on_commit(
+            lambda: executor.submit(generate_variants_safely, name))
+
+
+def variant_urls(image, ready):
+    if not image:
+        return {}
+    return {
+        variant: default_storage.url(variant_name(image.name, variant))
+        if ready else image.url
+        for variant in settings.RECIPE_IMAGE_VARIANTS
+    }
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from recipes.images import generate_variants
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии для уже загруженных картинок рецептов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать уже существующие копии',
+        )
+
+    def handle(self, *args, **options):
+        names = (
+            Recipe.objects.exclude(image='')
+            .values_list('image', flat=True)
+            .distinct()
+        )
+        processed = failed = 0
+        for name in names.iterator():
+            try:
+                generate_variants(name, force=options['force'])
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f'{name}: {error}')
+                continue
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {processed}, ошибок {failed}'))
@@ -0,0 +1,235 @@
+import base64
+import io
+import json
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.authtoken.models import Token
+
+from recipes.models import Ingredient, Recipe, Tag
+
+User = get_user_model()
+SCENARIOS = (
+    'recipe_list',
+    'recipe_list_filtered',
+    'recipe_detail',
+    'subscriptions',
+    'ingredient_search',
+    'shopping_list',
+    'recipe_create',
+    'recipe_update',
+)
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[index]
+
+
+def image_data():
+    output = io.BytesIO()
+    Image.new('RGB', (32, 32), (200, 120, 40)).save(output, 'PNG')
+    encoded = base64.b64encode(output.getvalue()).decode()
+    return f'data:image/png;base64,{encoded}'
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержки и число SQL-запросов основных эндпоинтов '
+            'на текущей базе данных')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios', nargs='*',
+            help=f'Сценарии через пробел, по умолчанию все: '
+                 f'{", ".join(SCENARIOS)}',
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--user', help='Имя пользователя, от которого идут запросы')
+        parser.add_argument(
+            '--output', help='Записать результаты в JSON-файл')
+
+    def handle(self, *args, **options):
+        scenarios = options['scenarios'] or SCENARIOS
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(
+                f'Неизвестные сценарии: {", ".join(sorted(unknown))}')
+        self.rng = random.Random(options['seed'])
+        self.user = self.get_user(options['user'])
+        self.client = Client(
+            HTTP_AUTHORIZATION=(
+                f'Token {Token.objects.get_or_create(user=self.user)[0]}'),
+        )
+        self.created = []
+        results = {}
+        try:
+            for scenario in scenarios:
+                requests = getattr(self, f'requests_{scenario}')()
+                results[scenario] = self.measure(
+                    requests, options['repeat'], options['warmup'])
+        finally:
+            Recipe.objects.filter(pk__in=self.created).delete()
+        report = {
+            'database': connection.vendor,
+            'recipes': Recipe.objects.count(),
+            'users': User.objects.count(),
+            'repeat': options['repeat'],
+            'results': results,
+        }
+        self.write_table(results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+    def get_user(self, username):
+        if username:
+            user = User.objects.filter(username=username).first()
+        else:
+            user = (
+                User.objects.filter(user_cart__isnull=False)
+                .order_by('id').first()
+                or User.objects.order_by('id').first()
+            )
+        if user is None:
+            raise CommandError(
+                'Нет пользователей: сначала запустите generate_dataset')
+        return user
+
+    def measure(self, requests, repeat, warmup):
+        for _ in range(warmup):
+            method, url, data = next(requests)
+            self.request(method, url, data)
+        durations = []
+        queries = []
+        for _ in range(repeat):
+            method, url, data = next(requests)
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                self.request(method, url, data)
+                durations.append((time.perf_counter() - started) * 1000)
+            queries.append(len(context.captured_queries))
+        result = {
+            f'p{percent}_ms': round(percentile(durations, percent), 2)
+            for percent in PERCENTILES
+        }
+        result['mean_ms'] = round(statistics.mean(durations), 2)
+        result['queries_median'] = statistics.median(queries)
+        result['queries_max'] = max(queries)
+        return result
+
+    def request(self, method, url, data=None):
+        if data is None:
+            response = getattr(self.client, method)(url)
+        else:
+            response = getattr(self.client, method)(
+                url, json.dumps(data), content_type='application/json')
+        if response.status_code >= 400:
+            raise CommandError(
+                f'{method.upper()} {url}: {response.status_code}')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        elif method == 'post':
+            self.created.append(json.loads(response.content)['id'])
+        return response
+
+    def recipe_ids(self):
+        return list(
+            Recipe.objects.order_by('-created_date', '-id')
+            .values_list('id', flat=True)[:1000]
+        )
+
+    def requests_recipe_list(self):
+        while True:
+            page = self.rng.randint(1, 5)
+            yield 'get', f'/api/recipes/?page={page}', None
+
+    def requests_recipe_list_filtered(self):
+        slugs = list(Tag.objects.values_list('slug', flat=True)[:3])
+        tags = '&'.join(f'tags={slug}' for slug in slugs)
+        while True:
+            flag = self.rng.choice(('is_favorited', 'is_in_shopping_cart'))
+            yield 'get', f'/api/recipes/?{tags}&{flag}=1', None
+
+    def requests_recipe_detail(self):
+        recipe_ids = self.recipe_ids()
+        while True:
+            yield 'get', f'/api/recipes/{self.rng.choice(recipe_ids)}/', None
+
+    def requests_subscriptions(self):
+        while True:
+            yield 'get', '/api/users/subscriptions/?recipes_limit=3', None
+
+    def requests_ingredient_search(self):
+        names = list(
+            Ingredient.objects.values_list('name', flat=True)[:500])
+        if not names:
+            raise CommandError('Нет ингредиентов для поиска')
+        while True:
+            name = self.rng.choice(names)
+            yield 'get', f'/api/ingredients/?name={name[:3]}', None
+
+    def requests_shopping_list(self):
+        while True:
+            yield (
+                'get', '/api/recipes/download_shopping_cart/?format=txt',
+                None,
+            )
+
+    def recipe_payload(self, image=True):
+        ingredient_ids = list(
+            Ingredient.objects.values_list('id', flat=True)[:200])
+        tag_ids = list(Tag.objects.values_list('id', flat=True))
+        payload = {
+            'ingredients': [
+                {'id': ingredient_id, 'amount': self.rng.randint(1, 500)}
+                for ingredient_id in self.rng.sample(
+                    ingredient_ids, min(6, len(ingredient_ids)))
+            ],
+            'tags': self.rng.sample(tag_ids, min(2, len(tag_ids))),
+            'name': 'Рецепт для замеров',
+            'text': 'Создан командой bench_endpoints',
+            'cooking_time': self.rng.randint(5, 180),
+        }
+        if image:
+            payload['image'] = image_data()
+        return payload
+
+    def requests_recipe_create(self):
+        while True:
+            yield 'post', '/api/recipes/', self.recipe_payload()
+
+    def requests_recipe_update(self):
+        recipe_id = self.request(
+            'post', '/api/recipes/', self.recipe_payload()).json()['id']
+        while True:
+            yield (
+                'patch', f'/api/recipes/{recipe_id}/',
+                self.recipe_payload(image=False),
+            )
+
+    def write_table(self, results):
+        columns = [f'p{percent}_ms' for percent in PERCENTILES]
+        self.stdout.write(
+            f'{"сценарий":<24}'
+            + ''.join(f'{column:>10}' for column in columns)
+            + f'{"запросов":>10}'
+        )
+        for scenario, result in results.items():
+            self.stdout.write(
+                f'{scenario:<24}'
+                + ''.join(f'{result[column]:>10.1f}' for column in columns)
+                + f'{result["queries_median"]:>10}'
+            )
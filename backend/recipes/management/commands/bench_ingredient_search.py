@@ -0,0 +1,49 @@
+import time
+
+from api.filters import IngredientFilter
+from api.serializers import IngredientSerializer
+from django.core.management.base import BaseCommand
+
+from recipes.models import Ingredient
+from recipes.search import ingredient_index
+
+DEFAULT_QUERIES = ('а', 'аб', 'абр', 'сах', 'мол', 'соль', 'перец', 'ов')
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает поиск ингредиентов в памяти с фильтром ORM'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', default=DEFAULT_QUERIES)
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        queries = options['queries']
+        repeat = options['repeat']
+        ingredient_index.invalidate()
+        started = time.perf_counter()
+        ingredient_index.ensure_built()
+        self.stdout.write(
+            f'Индекс построен за '
+            f'{(time.perf_counter() - started) * 1000:.1f} мс, '
+            f'{len(ingredient_index.index[0])} ингредиентов'
+        )
+        self.stdout.write(f'{"запрос":<10}{"orm, мс":>12}{"index, мс":>12}')
+        for query in queries:
+            orm = self.measure(repeat, self.orm_search, query)
+            index = self.measure(repeat, ingredient_index.search, query)
+            self.stdout.write(f'{query:<10}{orm:>12.3f}{index:>12.3f}')
+
+    @staticmethod
+    def orm_search(query):
+        queryset = IngredientFilter(
+            {'name': query}, queryset=Ingredient.objects.all()
+        ).qs
+        return IngredientSerializer(queryset, many=True).data
+
+    @staticmethod
+    def measure(repeat, search, query):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            search(query)
+        return (time.perf_counter() - started) * 1000 / repeat
@@ -0,0 +1,161 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from users.models import Follow
+
+from recipes import feed
+from recipes.models import AuthorStats, FeedEntry, Recipe
+
+User = get_user_model()
+PREFIX = 'bench_feed'
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = ('Замеряет ленту рецептов авторов из подписок для пользователя '
+            'с большим числом подписок')
+
+    def add_arguments(self, parser):
+        source = parser.add_mutually_exclusive_group(required=True)
+        source.add_argument(
+            '--authors', type=int,
+            help=('Создать на время замера пользователя, подписанного на '
+                  'указанное число новых авторов'),
+        )
+        source.add_argument(
+            '--user', help='Замерить ленту существующего пользователя')
+        parser.add_argument('--recipes-per-author', type=int, default=20)
+        parser.add_argument(
+            '--pages', type=int, default=20,
+            help='Сколько страниц пролистать по курсору',
+        )
+        parser.add_argument('--limit', type=int, default=6)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if options['user'] is not None:
+            follower = User.objects.filter(username=options['user']).first()
+            if follower is None:
+                raise CommandError(
+                    f'Пользователь {options["user"]} не найден')
+            self.run(follower, options)
+            return
+        if options['authors'] <= 0:
+            raise CommandError('--authors должно быть больше 0')
+        self.cleanup()
+        try:
+            follower = self.prepare(
+                options['authors'], options['recipes_per_author'])
+            self.run(follower, options)
+        finally:
+            self.cleanup()
+
+    def run(self, follower, options):
+        client = Client(
+            HTTP_AUTHORIZATION=(
+                f'Token {Token.objects.get_or_create(user=follower)[0]}'),
+        )
+        self.stdout.write(
+            f'Подписок: {Follow.objects.filter(user=follower).count()}, '
+            f'рецептов: {Recipe.objects.count()}'
+        )
+        self.stdout.write(
+            f'{"страница":>10}{"мс":>10}{"запросов":>10}')
+        url = f'/api/recipes/feed/?limit={options["limit"]}'
+        for page in range(1, options['pages'] + 1):
+            elapsed, queries, data = self.measure(
+                client, url, options['repeat'])
+            if page in (1, options['pages']) or page % 10 == 0:
+                self.stdout.write(f'{page:>10}{elapsed:>10.1f}{queries:>10}')
+            url = data['next']
+            if url is None:
+                break
+
+    @staticmethod
+    def measure(client, url, repeat):
+        durations = []
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as context:
+                started = time.perf_counter()
+                response = client.get(url)
+                durations.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'{url}: ответ {response.status_code}')
+        return (
+            min(durations), len(context.captured_queries), response.json())
+
+    @transaction.atomic
+    def prepare(self, authors, recipes_per_author):
+        follower = User.objects.create(
+            username=f'{PREFIX}_follower',
+            email=f'{PREFIX}_follower@example.com',
+        )
+        User.objects.bulk_create(
+            User(
+                username=f'{PREFIX}_author_{number}',
+                email=f'{PREFIX}_author_{number}@example.com',
+            )
+            for number in range(authors)
+        )
+        author_ids = self.author_ids()
+        for start in range(0, len(author_ids), BATCH_SIZE):
+            chunk = author_ids[start:start + BATCH_SIZE]
+            Follow.objects.bulk_create(
+                Follow(user=follower, following_id=author_id)
+                for author_id in chunk
+            )
+            Recipe.objects.bulk_create(
+                Recipe(
+                    author_id=author_id,
+                    name=f'Рецепт {number}',
+                    text='Синтетический рецепт',
+                    cooking_time=number % 120 + 1,
+                )
+                for number in range(recipes_per_author)
+                for author_id in chunk
+            )
+        feed.rebuild([follower.id])
+        self.stdout.write(
+            f'Создано авторов: {len(author_ids)}, '
+            f'рецептов: {len(author_ids) * recipes_per_author}'
+        )
+        return follower
+
+    @staticmethod
+    def author_ids():
+        return list(
+            User.objects.filter(username__startswith=f'{PREFIX}_author_')
+            .values_list('id', flat=True)
+        )
+
+    @transaction.atomic
+    def cleanup(self):
+        follower = User.objects.filter(username=f'{PREFIX}_follower').first()
+        author_ids = self.author_ids()
+        if follower is None and not author_ids:
+            return
+        with connection.cursor() as cursor:
+            if follower is not None:
+                for model in (FeedEntry, Follow):
+                    cursor.execute(
+                        f'DELETE FROM {model._meta.db_table} '
+                        f'WHERE user_id = %s',
+                        [follower.id],
+                    )
+            for start in range(0, len(author_ids), BATCH_SIZE):
+                chunk = author_ids[start:start + BATCH_SIZE]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                for model, column in ((Recipe, 'author_id'),
+                                      (AuthorStats, 'user_id')):
+                    cursor.execute(
+                        f'DELETE FROM {model._meta.db_table} '
+                        f'WHERE {column} IN ({placeholders})',
+                        chunk,
+                    )
+        User.objects.filter(username__startswith=f'{PREFIX}_').delete()
+        self.stdout.write('Синтетические данные удалены')
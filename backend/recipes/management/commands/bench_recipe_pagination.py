@@ -0,0 +1,116 @@
+import time
+
+from api.pagination import RecipePagination
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.test import Client
+
+from recipes import counters
+from recipes.models import Recipe
+
+User = get_user_model()
+DEFAULT_OFFSETS = (0, 1000, 100000)
+BATCH_SIZE = 1000
+AUTHOR = 'bench_pagination_author'
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время выдачи страницы рецептов при постраничной '
+            'и курсорной пагинации')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'offsets', nargs='*', type=int, default=DEFAULT_OFFSETS)
+        parser.add_argument(
+            '--recipes', type=int, default=0,
+            help=('Сколько синтетических рецептов создать на время замера '
+                  '(по умолчанию замер идёт на имеющихся данных)'),
+        )
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Не удалять созданные рецепты после замера',
+        )
+        parser.add_argument('--limit', type=int, default=6)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        created = self.create_recipes(options['recipes'])
+        try:
+            self.run(options)
+        finally:
+            if created is not None:
+                self.finish(*created, keep=options['keep'])
+
+    def run(self, options):
+        total = Recipe.objects.count()
+        limit = options['limit']
+        client = Client()
+        self.stdout.write(f'Рецептов: {total}')
+        self.stdout.write(
+            f'{"смещение":>10}{"page, мс":>12}{"cursor, мс":>12}')
+        for offset in options['offsets']:
+            if offset >= total:
+                self.stdout.write(f'{offset:>10}  пропущено: нет данных')
+                continue
+            page_number = offset // limit + 1
+            page_url = f'/api/recipes/?limit={limit}&page={page_number}'
+            cursor_url = self.cursor_url(offset, limit)
+            page = self.measure(client, page_url, options['repeat'])
+            cursor = self.measure(client, cursor_url, options['repeat'])
+            self.stdout.write(f'{offset:>10}{page:>12.1f}{cursor:>12.1f}')
+
+    @staticmethod
+    def cursor_url(offset, limit):
+        if not offset:
+            return f'/api/recipes/?limit={limit}&pagination=cursor'
+        created_date, pk = (
+            Recipe.objects.order_by(*RecipePagination.ordering)
+            .values_list('created_date', 'id')[offset - 1]
+        )
+        cursor = RecipePagination.encode_cursor(created_date, pk)
+        return f'/api/recipes/?limit={limit}&cursor={cursor}'
+
+    @staticmethod
+    def measure(client, url, repeat):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(
+                    f'{url}: ответ {response.status_code}')
+        return (time.perf_counter() - started) * 1000 / repeat
+
+    def create_recipes(self, count):
+        if count <= 0:
+            return None
+        author, author_created = User.objects.get_or_create(
+            username=AUTHOR, defaults={'email': f'{AUTHOR}@example.com'})
+        last_id = Recipe.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        for start in range(0, count, BATCH_SIZE):
+            Recipe.objects.bulk_create(
+                Recipe(
+                    author=author,
+                    name=f'Рецепт {number}',
+                    text='Синтетический рецепт',
+                    cooking_time=number % 120 + 1,
+                )
+                for number in range(start, min(start + BATCH_SIZE, count))
+            )
+        self.stdout.write(f'Создано рецептов: {count}')
+        return author, author_created, last_id
+
+    def finish(self, author, author_created, last_id, keep):
+        if keep:
+            counters.reconcile([], [author.id])
+            return
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {Recipe._meta.db_table} '
+                f'WHERE author_id = %s AND id > %s',
+                [author.id, last_id],
+            )
+            if author_created:
+                author.delete()
+        self.stdout.write('Синтетические рецепты удалены')
@@ -0,0 +1,127 @@
+import random
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Max, Q
+
+from recipes import counters, fulltext
+from recipes.models import Recipe
+
+User = get_user_model()
+DEFAULT_QUERIES = ('капуст', 'суп грибной', 'шоколад', 'рыбн пирог')
+WORDS = (
+    'суп', 'салат', 'пирог', 'рагу', 'запеканка', 'паста', 'каша', 'омлет',
+    'соус', 'десерт', 'овощной', 'куриный', 'рыбный', 'сырный', 'грибной',
+    'томатный', 'сливочный', 'острый', 'домашний', 'летний', 'капуста',
+    'картофель', 'морковь', 'лук', 'чеснок', 'шоколад', 'ваниль', 'корица',
+    'тесто', 'мука', 'сахар', 'соль', 'перец', 'масло', 'молоко', 'яйцо',
+)
+BATCH_SIZE = 1000
+AUTHOR = 'bench_search_author'
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает полнотекстовый поиск рецептов с поиском '
+            'через icontains')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'queries', nargs='*', default=DEFAULT_QUERIES)
+        parser.add_argument(
+            '--recipes', type=int, default=0,
+            help=('Сколько синтетических рецептов создать на время замера '
+                  '(по умолчанию замер идёт на имеющихся данных)'),
+        )
+        parser.add_argument(
+            '--keep', action='store_true',
+            help='Не удалять созданные рецепты после замера',
+        )
+        parser.add_argument('--limit', type=int, default=6)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        created = self.create_recipes(options['recipes'], options['seed'])
+        try:
+            self.run(options)
+        finally:
+            if created is not None:
+                self.finish(*created, keep=options['keep'])
+
+    def run(self, options):
+        self.stdout.write(
+            f'База: {connection.vendor}, рецептов: {Recipe.objects.count()}')
+        self.stdout.write(
+            f'{"запрос":<16}{"найдено":>10}'
+            f'{"полнотекст, мс":>16}{"icontains, мс":>16}'
+        )
+        for query in options['queries']:
+            found, indexed = self.measure(
+                lambda: fulltext.search(Recipe.objects.all(), query),
+                options['limit'], options['repeat'],
+            )
+            _, scanned = self.measure(
+                lambda: self.icontains(query),
+                options['limit'], options['repeat'],
+            )
+            self.stdout.write(
+                f'{query:<16}{found:>10}{indexed:>16.1f}{scanned:>16.1f}')
+
+    @staticmethod
+    def icontains(query):
+        queryset = Recipe.objects.order_by('-created_date', '-id')
+        for term in fulltext.search_terms(query):
+            queryset = queryset.filter(
+                Q(name__icontains=term) | Q(text__icontains=term))
+        return queryset
+
+    @staticmethod
+    def measure(build, limit, repeat):
+        durations = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = build()
+            found = queryset.count()
+            list(queryset[:limit])
+            durations.append((time.perf_counter() - started) * 1000)
+        return found, statistics.median(durations)
+
+    def create_recipes(self, count, seed):
+        if count <= 0:
+            return None
+        rng = random.Random(seed)
+        author, author_created = User.objects.get_or_create(
+            username=AUTHOR, defaults={'email': f'{AUTHOR}@example.com'})
+        last_id = Recipe.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+        started = time.perf_counter()
+        for start in range(0, count, BATCH_SIZE):
+            Recipe.objects.bulk_create(
+                Recipe(
+                    author=author,
+                    name=' '.join(rng.sample(WORDS, 3)).capitalize(),
+                    text=' '.join(rng.choices(WORDS, k=20)),
+                    cooking_time=rng.randint(5, 180),
+                )
+                for _ in range(min(BATCH_SIZE, count - start))
+            )
+        self.stdout.write(
+            f'Создано рецептов: {count} '
+            f'за {time.perf_counter() - started:.1f} с')
+        return author, author_created, last_id
+
+    def finish(self, author, author_created, last_id, keep):
+        if keep:
+            counters.reconcile([], [author.id])
+            return
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {Recipe._meta.db_table} '
+                f'WHERE author_id = %s AND id > %s',
+                [author.id, last_id],
+            )
+            if author_created:
+                author.delete()
+        self.stdout.write('Синтетические рецепты удалены')
@@ -0,0 +1,38 @@
+import tempfile
+import time
+import tracemalloc
+
+from api.shopping_list import register_font, render_pdf
+from django.core.management.base import BaseCommand
+
+DEFAULT_SIZES = (10, 1000, 10000)
+
+
+class Command(BaseCommand):
+    help = 'Замеряет время и пиковую память генерации списка покупок'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'sizes', nargs='*', type=int, default=DEFAULT_SIZES)
+
+    def handle(self, *args, **options):
+        register_font()
+        self.stdout.write(
+            f'{"строк":>8}{"время, мс":>12}'
+            f'{"память, КБ":>12}{"размер, КБ":>12}'
+        )
+        for size in options['sizes']:
+            ingredients = (
+                (f'ингредиент {number}', 'г', number) for number in range(size)
+            )
+            with tempfile.TemporaryFile() as output:
+                tracemalloc.start()
+                started = time.perf_counter()
+                render_pdf(ingredients, 'benchmark', output)
+                elapsed = (time.perf_counter() - started) * 1000
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.stdout.write(
+                    f'{size:>8}{elapsed:>12.1f}{peak / 1024:>12.0f}'
+                    f'{output.tell() / 1024:>12.0f}'
+                )
@@ -0,0 +1,169 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from users.models import Follow
+
+from recipes import feed
+from recipes.models import (Favorite, FeedEntry, Ingredient,
+                            IngredientAmount, Recipe, ShopCart,
+                            ShopCartIngredient)
+
+User = get_user_model()
+FEED_ORDERING = ('-created_date', '-id')
+LARGE_TABLE_MODELS = (
+    Recipe, IngredientAmount, Favorite, ShopCart, ShopCartIngredient,
+    Follow, Ingredient, FeedEntry,
+)
+SEQUENTIAL_SCAN_PATTERNS = {
+    'postgresql': r'Seq Scan on "?{table}"?(\s|$)',
+    'sqlite': r'SCAN (TABLE )?{table}(?! USING)(\s|$)',
+}
+
+
+def hot_path_queries(user_id, author_id, recipe_id):
+    now = timezone.now()
+    return (
+        (
+            'лента рецептов',
+            None,
+            Recipe.objects.order_by(*FEED_ORDERING)[:6],
+        ),
+        (
+            'лента рецептов по курсору',
+            None,
+            Recipe.objects.filter(
+                Q(created_date__lt=now) | Q(created_date=now, id__lt=recipe_id)
+            ).order_by(*FEED_ORDERING)[:6],
+        ),
+        (
+            'рецепты автора',
+            None,
+            Recipe.objects.filter(
+                author_id=author_id).order_by(*FEED_ORDERING)[:6],
+        ),
+        (
+            'лента подписок',
+            None,
+            feed.recipes_for(Recipe.objects.all(), user_id).order_by(
+                '-feed_date', '-feed_recipe')[:6],
+        ),
+        (
+            'избранные рецепты',
+            None,
+            Recipe.objects.annotate(is_favorited=Exists(
+                Favorite.objects.filter(
+                    user_id=user_id, recipe=OuterRef('pk'))
+            )).filter(is_favorited=True).order_by(*FEED_ORDERING)[:6],
+        ),
+        (
+            'ингредиенты рецепта',
+            None,
+            IngredientAmount.objects.filter(
+                recipe_id=recipe_id).values_list('ingredient_id', 'amount'),
+        ),
+        (
+            'корзины с рецептом',
+            None,
+            ShopCart.objects.filter(
+                recipe_id=recipe_id).values_list('user_id', flat=True),
+        ),
+        (
+            'скачивание списка покупок',
+            None,
+            ShopCartIngredient.objects.filter(user_id=user_id).order_by(
+                'ingredient__name'
+            ).values_list(
+                'ingredient__name', 'ingredient__measurement_unit', 'amount'
+            ),
+        ),
+        (
+            'подписки пользователя',
+            None,
+            Follow.objects.filter(user_id=user_id).order_by('-id')[:6],
+        ),
+        (
+            'подписчики автора',
+            None,
+            Follow.objects.filter(
+                following_id=author_id).values_list('user_id', flat=True),
+        ),
+        (
+            'поиск ингредиента по префиксу',
+            'postgresql',
+            Ingredient.objects.filter(name__startswith='Мук')[:50],
+        ),
+        (
+            'поиск ингредиента по подстроке',
+            'postgresql',
+            Ingredient.objects.filter(name__icontains='мук')[:50],
+        ),
+    )
+
+
+class Command(BaseCommand):
+    help = ('Проверяет планы запросов горячих путей и падает, если '
+            'какой-то из них полностью сканирует большую таблицу')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-rows', type=int, default=10000,
+            help='С какого числа строк таблица считается большой',
+        )
+        parser.add_argument(
+            '--verbose-plans', action='store_true',
+            help='Печатать план каждого запроса',
+        )
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in SEQUENTIAL_SCAN_PATTERNS:
+            raise CommandError(f'База данных {vendor} не поддерживается')
+        large_tables = [
+            model._meta.db_table for model in LARGE_TABLE_MODELS
+            if model.objects.count() >= options['min_rows']
+        ]
+        self.stdout.write(
+            'Большие таблицы: ' + (', '.join(large_tables) or 'нет'))
+        failures = []
+        for name, only_vendor, queryset in hot_path_queries(
+                *self.sample_ids()):
+            if only_vendor and only_vendor != vendor:
+                continue
+            plan = queryset.explain()
+            if options['verbose_plans']:
+                self.stdout.write(f'{name}:\n{plan}\n')
+            scanned = [
+                table for table in large_tables
+                if re.search(
+                    SEQUENTIAL_SCAN_PATTERNS[vendor].format(table=table),
+                    plan,
+                    re.MULTILINE,
+                )
+            ]
+            if scanned:
+                failures.append(f'{name}: {", ".join(scanned)}')
+                self.stdout.write(self.style.ERROR(
+                    f'{name}: полное сканирование {", ".join(scanned)}'))
+            else:
+                self.stdout.write(f'{name}: OK')
+        if failures:
+            raise CommandError(
+                'Полное сканирование больших таблиц: ' + '; '.join(failures))
+        self.stdout.write(self.style.SUCCESS('Все планы используют индексы'))
+
+    @staticmethod
+    def sample_ids():
+        recipe = (
+            Recipe.objects.order_by(*FEED_ORDERING)
+            .values_list('id', 'author_id').first()
+        )
+        recipe_id, author_id = recipe or (0, 0)
+        user_id = (
+            User.objects.order_by('id').values_list('id', flat=True).first()
+            or 0
+        )
+        return user_id, author_id, recipe_id
@@ -0,0 +1,253 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.authtoken.models import Token
+from users.models import Follow
+
+from recipes import counters, feed, shopping_list, tag_masks
+from recipes.models import (AuthorStats, Favorite, FeedEntry, Ingredient,
+                            IngredientAmount, Recipe, ShopCart,
+                            ShopCartIngredient, Tag)
+from recipes.versions import bump_version
+
+User = get_user_model()
+PREFIX = 'synthetic'
+PASSWORD = 'synthetic-password'
+UNITS = ('г', 'кг', 'мл', 'л', 'шт.', 'ст. л.', 'ч. л.', 'по вкусу')
+WORDS = (
+    'суп', 'салат', 'пирог', 'рагу', 'запеканка', 'паста', 'каша',
+    'омлет', 'соус', 'десерт', 'овощной', 'куриный', 'рыбный', 'сырный',
+    'грибной', 'томатный', 'сливочный', 'острый', 'домашний', 'летний',
+)
+
+
+class Command(BaseCommand):
+    help = ('Создаёт воспроизводимый синтетический набор данных '
+            'для нагрузочных замеров')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--tags', type=int, default=8)
+        parser.add_argument(
+            '--ingredients', type=int, default=0,
+            help='Досоздать синтетические ингредиенты до указанного числа',
+        )
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=6)
+        parser.add_argument('--tags-per-recipe', type=int, default=2)
+        parser.add_argument('--favorites', type=int, default=5000)
+        parser.add_argument('--carts', type=int, default=1000)
+        parser.add_argument('--follows', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Удалить ранее созданный синтетический набор',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        if options['clear']:
+            self.clear()
+        if User.objects.filter(username__startswith=f'{PREFIX}_').exists():
+            raise CommandError(
+                'Синтетический набор уже создан, используйте --clear')
+        started = time.perf_counter()
+        with transaction.atomic():
+            user_ids = self.create_users(options['users'])
+            tag_ids = self.create_tags(options['tags'])
+            ingredient_ids = self.create_ingredients(options['ingredients'])
+            if not user_ids or not tag_ids or not ingredient_ids:
+                raise CommandError(
+                    'Нужны хотя бы один пользователь, тег и ингредиент')
+            recipe_ids = self.create_recipes(options['recipes'], user_ids)
+            self.create_recipe_relations(
+                recipe_ids, tag_ids, ingredient_ids,
+                options['tags_per_recipe'],
+                options['ingredients_per_recipe'],
+            )
+            self.create_pairs(
+                Favorite, 'user_id', user_ids, 'recipe_id', recipe_ids,
+                options['favorites'])
+            self.create_pairs(
+                ShopCart, 'user_id', user_ids, 'recipe_id', recipe_ids,
+                options['carts'])
+            self.create_pairs(
+                Follow, 'user_id', user_ids, 'following_id', user_ids,
+                options['follows'], allow_same=False)
+            self.refresh_derived_data(recipe_ids, user_ids)
+        bump_version('tags')
+        bump_version('ingredients')
+        self.stdout.write(self.style.SUCCESS(
+            f'Набор создан за {time.perf_counter() - started:.1f} с: '
+            f'пользователей {len(user_ids)}, рецептов {len(recipe_ids)}'
+        ))
+
+    def bulk_create(self, model, objects, **kwargs):
+        batch = []
+        for obj in objects:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                model.objects.bulk_create(batch, **kwargs)
+                batch = []
+        model.objects.bulk_create(batch, **kwargs)
+
+    def create_users(self, count):
+        password = make_password(PASSWORD)
+        self.bulk_create(User, (
+            User(
+                username=f'{PREFIX}_{number}',
+                email=f'{PREFIX}_{number}@example.com',
+                first_name=f'Имя {number}',
+                last_name=f'Фамилия {number}',
+                password=password,
+            )
+            for number in range(count)
+        ))
+        return list(
+            User.objects.filter(username__startswith=f'{PREFIX}_')
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def create_tags(self, count):
+        self.bulk_create(Tag, (
+            Tag(
+                name=f'{PREFIX} {number}',
+                color=f'#{self.rng.randrange(0x1000000):06X}',
+                slug=f'{PREFIX}_{number}',
+            )
+            for number in range(count)
+        ), ignore_conflicts=True)
+        return list(
+            Tag.objects.filter(slug__startswith=f'{PREFIX}_')
+            .order_by('id').values_list('id', flat=True))
+
+    def create_ingredients(self, count):
+        missing = count - Ingredient.objects.count()
+        if missing > 0:
+            self.bulk_create(Ingredient, (
+                Ingredient(
+                    name=f'{PREFIX} {self.rng.choice(WORDS)} {number}',
+                    measurement_unit=self.rng.choice(UNITS),
+                )
+                for number in range(missing)
+            ))
+        return list(
+            Ingredient.objects.order_by('id').values_list('id', flat=True))
+
+    def create_recipes(self, count, user_ids):
+        self.bulk_create(Recipe, (
+            Recipe(
+                author_id=self.rng.choice(user_ids),
+                name=' '.join(self.rng.sample(WORDS, 2)).capitalize(),
+                text='Синтетический рецепт',
+                cooking_time=self.rng.randint(5, 180),
+            )
+            for _ in range(count)
+        ))
+        return list(
+            Recipe.objects.filter(author_id__in=user_ids)
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def create_recipe_relations(self, recipe_ids, tag_ids, ingredient_ids,
+                                tags_per_recipe, ingredients_per_recipe):
+        tags_per_recipe = min(tags_per_recipe, len(tag_ids))
+        ingredients_per_recipe = min(
+            ingredients_per_recipe, len(ingredient_ids))
+        self.bulk_create(Recipe.tags.through, (
+            Recipe.tags.through(recipe_id=recipe_id, tag_id=tag_id)
+            for recipe_id in recipe_ids
+            for tag_id in self.rng.sample(tag_ids, tags_per_recipe)
+        ))
+        self.bulk_create(IngredientAmount, (
+            IngredientAmount(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_id,
+                amount=self.rng.randint(1, 500),
+            )
+            for recipe_id in recipe_ids
+            for ingredient_id in self.rng.sample(
+                ingredient_ids, ingredients_per_recipe)
+        ))
+
+    def create_pairs(self, model, left_field, left_ids, right_field,
+                     right_ids, count, allow_same=True):
+        available = len(left_ids) * len(right_ids)
+        if not allow_same:
+            available -= len(set(left_ids) & set(right_ids))
+        count = min(count, available)
+        pairs = set()
+        while len(pairs) < count:
+            left = self.rng.choice(left_ids)
+            right = self.rng.choice(right_ids)
+            if allow_same or left != right:
+                pairs.add((left, right))
+        self.bulk_create(model, (
+            model(**{left_field: left, right_field: right})
+            for left, right in sorted(pairs)
+        ), ignore_conflicts=True)
+
+    def refresh_derived_data(self, recipe_ids, user_ids):
+        tag_masks.rebuild()
+        counters.reconcile(recipe_ids, user_ids)
+        shopping_list.rebuild()
+        feed.rebuild(user_ids)
+
+    def clear(self):
+        users = User.objects.filter(
+            username__startswith=f'{PREFIX}_').values('id')
+        recipes = Recipe.objects.filter(author_id__in=users).values('id')
+        tags = Tag.objects.filter(slug__startswith=f'{PREFIX}_').values('id')
+        ingredients = Ingredient.objects.filter(
+            name__startswith=f'{PREFIX} ').values('id')
+        # Удаляем напрямую в порядке зависимостей, чтобы не загружать
+        # набор в память и не вызывать сигналы на каждую строку;
+        # производные данные пересчитываются один раз ниже.
+        deletions = (
+            (FeedEntry, 'user_id', users), (FeedEntry, 'recipe_id', recipes),
+            (Favorite, 'user_id', users), (Favorite, 'recipe_id', recipes),
+            (ShopCart, 'user_id', users), (ShopCart, 'recipe_id', recipes),
+            (ShopCartIngredient, 'user_id', users),
+            (ShopCartIngredient, 'ingredient_id', ingredients),
+            (Follow, 'user_id', users), (Follow, 'following_id', users),
+            (Recipe.tags.through, 'recipe_id', recipes),
+            (Recipe.tags.through, 'tag_id', tags),
+            (Recipe.ingredients.through, 'recipe_id', recipes),
+            (Recipe.ingredients.through, 'ingredient_id', ingredients),
+            (IngredientAmount, 'recipe_id', recipes),
+            (IngredientAmount, 'ingredient_id', ingredients),
+            (Recipe, 'author_id', users),
+            (AuthorStats, 'user_id', users),
+            (Token, 'user_id', users),
+            (Tag, 'id', tags),
+            (Ingredient, 'id', ingredients),
+        )
+        with transaction.atomic():
+            affected_recipes = set()
+            for model in (Favorite, ShopCart):
+                affected_recipes.update(
+                    model.objects.filter(user_id__in=users)
+                    .exclude(recipe_id__in=recipes)
+                    .values_list('recipe_id', flat=True)
+                )
+            with connection.cursor() as cursor:
+                for model, column, subquery in deletions:
+                    sql, params = subquery.query.sql_with_params()
+                    cursor.execute(
+                        f'DELETE FROM {model._meta.db_table} '
+                        f'WHERE {column} IN ({sql})',
+                        params,
+                    )
+            User.objects.filter(username__startswith=f'{PREFIX}_').delete()
+            tag_masks.rebuild()
+            counters.recount_recipes(affected_recipes)
+            shopping_list.rebuild()
+        bump_version('tags')
+        bump_version('ingredients')
+        self.stdout.write('Синтетический набор удалён')
@@ -1,16 +1,115 @@
+import csv
 import json
+import os
+import time
 
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
-from recipes.models import Ingredient
+from recipes.models import Ingredient, Tag
+from recipes.versions import bump_version
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'recipes', 'data')
+MODELS = {
+    'ingredients': (
+        Ingredient,
+        ('name', 'measurement_unit'),
+        ('name', 'measurement_unit'),
+        os.path.join(DATA_DIR, 'ingredients.json'),
+    ),
+    'tags': (
+        Tag,
+        ('name', 'color', 'slug'),
+        ('slug',),
+        os.path.join(DATA_DIR, 'tags.json'),
+    ),
+}
+CHUNK_SIZE = 64 * 1024
+
+
+def iter_json(file):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), ''):
+        buffer += chunk
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if not started and buffer[position:position + 1] == '[':
+                started = True
+                position += 1
+                continue
+            if buffer[position:position + 1] in ('', ']'):
+                break
+            try:
+                row, position = decoder.raw_decode(buffer, position)
+            except ValueError:
+                break
+            yield row
+        buffer = buffer[position:]
+    if buffer.strip() not in ('', ']'):
+        raise CommandError('Некорректный JSON: файл обрывается')
+
+
+def iter_csv(file, fields):
+    for row in csv.reader(file):
+        if row:
+            yield dict(zip(fields, row))
 
 
 class Command(BaseCommand):
+    help = 'Загружает ингредиенты или теги из JSON и CSV файлов'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*')
+        parser.add_argument(
+            '--model', choices=MODELS, default='ingredients')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
     def handle(self, *args, **options):
-        with open('recipes/data/ingredients.json', 'rb') as f:
-            data = json.load(f)
-            for i in data:
-                ingredient = Ingredient()
-                ingredient.name = i['name']
-                ingredient.measurement_unit = i['measurement_unit']
-                ingredient.save()
+        model, fields, key_fields, default_path = MODELS[options['model']]
+        paths = options['paths'] or [default_path]
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+        total = created = 0
+        with transaction.atomic():
+            seen = set(model.objects.values_list(*key_fields))
+            batch = []
+            for row in self.iter_rows(paths, fields):
+                total += 1
+                key = tuple(row[field] for field in key_fields)
+                if key in seen:
+                    continue
+                seen.add(key)
+                batch.append(model(**row))
+                if len(batch) >= batch_size:
+                    model.objects.bulk_create(batch)
+                    created += len(batch)
+                    batch = []
+            model.objects.bulk_create(batch)
+            created += len(batch)
+        bump_version(options['model'])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано {total}, добавлено {created}, '
+            f'пропущено {total - created} за {elapsed:.2f} с '
+            f'({total / elapsed if elapsed else total:.0f} строк/с)'
+        ))
+
+    def iter_rows(self, paths, fields):
+        for path in paths:
+            extension = os.path.splitext(path)[1].lower()
+            if extension not in ('.json', '.csv'):
+                raise CommandError(f'Неподдерживаемый формат файла: {path}')
+            with open(path, encoding='utf-8', newline='') as file:
+                rows = (
+                    iter_json(file) if extension == '.json'
+                    else iter_csv(file, fields)
+                )
+                for row in rows:
+                    yield {
+                        field: str(row[field]).strip() for field in fields
+                    }
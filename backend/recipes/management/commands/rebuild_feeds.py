@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from recipes import feed
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты рецептов авторов из подписок'
+
+    def handle(self, *args, **options):
+        feed.rebuild()
+        self.stdout.write(self.style.SUCCESS('Ленты подписок пересобраны'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes import shopping_list
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает агрегированные списки покупок и сверяет их'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сверить агрегат с живым запросом',
+        )
+
+    def handle(self, *args, **options):
+        if not options['check']:
+            shopping_list.rebuild()
+            self.stdout.write('Списки покупок пересобраны')
+        mismatches = shopping_list.find_mismatches()
+        for (user_id, ingredient_id), live, stored in mismatches[:20]:
+            self.stderr.write(
+                f'user={user_id} ingredient={ingredient_id}: '
+                f'ожидается {live}, сохранено {stored}'
+            )
+        if mismatches:
+            raise CommandError(f'Расхождений: {len(mismatches)}')
+        self.stdout.write(self.style.SUCCESS('Расхождений нет'))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from recipes import tag_masks
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает битовые маски тегов у всех рецептов'
+
+    def handle(self, *args, **options):
+        total = tag_masks.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Маски тегов пересчитаны для {total} рецептов'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from recipes import counters
+
+
+class Command(BaseCommand):
+    help = ('Сверяет счётчики избранного, корзин и рецептов автора '
+            'с данными и исправляет расхождения')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Только сверить счётчики, ничего не исправляя',
+        )
+
+    def handle(self, *args, **options):
+        recipes = counters.recipe_mismatches()
+        authors = counters.author_mismatches()
+        for recipe_id, expected in recipes[:20]:
+            self.stderr.write(f'recipe={recipe_id}: ожидается {expected}')
+        for author_id, live, stored in authors[:20]:
+            self.stderr.write(
+                f'author={author_id}: ожидается {live}, сохранено {stored}')
+        total = len(recipes) + len(authors)
+        if options['check']:
+            if total:
+                raise CommandError(f'Расхождений: {total}')
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+            return
+        counters.reconcile(
+            [recipe_id for recipe_id, _ in recipes],
+            [author_id for author_id, _, _ in authors],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено расхождений: {total}'))
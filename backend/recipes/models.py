@@ -1,8 +1,13 @@
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.db import models
 
 User = get_user_model()
+RECIPE_DERIVED_FIELDS = (
+    'tags_mask', 'favorites_count', 'cart_count', 'search_vector',
+    'image_variants_ready',
+)
 
 
 class Tag(models.Model):
@@ -44,6 +49,13 @@ class Ingredient(models.Model):
         ordering = ('name',)
         verbose_name = 'Ingredient'
         verbose_name_plural = 'Ingredients'
+        indexes = [
+            models.Index(
+                fields=('name',),
+                name='ingredient_name_prefix_idx',
+                opclasses=('varchar_pattern_ops',),
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -91,15 +103,64 @@ class Recipe(models.Model):
         auto_now_add=True,
         verbose_name='Дата добавления рецепта',
     )
+    tags_mask = models.BigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Битовая маска тегов',
+    )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном',
+    )
+    cart_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В корзинах',
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name='Поисковый вектор',
+    )
+    image_variants_ready = models.BooleanField(
+        default=False,
+        editable=False,
+        verbose_name='Уменьшенные копии готовы',
+    )
 
     class Meta:
         ordering = ('-created_date',)
         verbose_name = 'Recipe'
         verbose_name_plural = 'Recipes'
+        indexes = [
+            models.Index(
+                fields=('-created_date', '-id'), name='recipe_feed_idx'),
+            models.Index(
+                fields=('author', '-created_date', '-id'),
+                name='recipe_author_feed_idx',
+            ),
+            models.Index(
+                fields=('-favorites_count', '-id'),
+                name='recipe_popularity_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and not kwargs.get('force_insert')
+                and kwargs.get('update_fields') is None):
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in RECIPE_DERIVED_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
 
 class IngredientAmount(models.Model):
     ingredient = models.ForeignKey(
@@ -121,6 +182,12 @@ class IngredientAmount(models.Model):
     class Meta:
         verbose_name = 'Amount'
         verbose_name_plural = 'Amounts'
+        indexes = [
+            models.Index(
+                fields=('recipe', 'ingredient', 'amount'),
+                name='amount_recipe_covering_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.ingredient}: {self.recipe}'
@@ -175,6 +242,108 @@ class ShopCart(models.Model):
                 fields=('user', 'recipe'), name='unique_shop_cart'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=('recipe', 'user'), name='shop_cart_recipe_user_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.recipe}'
+
+
+class ShopCartIngredient(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='cart_ingredients',
+        verbose_name='Пользователь',
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        related_name='cart_ingredients',
+        verbose_name='Ингредиент',
+    )
+    amount = models.IntegerField(verbose_name='Amount')
+
+    class Meta:
+        verbose_name = 'Shoping cart ingredient'
+        verbose_name_plural = 'Shoping cart ingredients'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'ingredient'), name='unique_cart_ingredient'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.user}: {self.ingredient}'
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='author_stats',
+        verbose_name='Автор',
+    )
+    recipes_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество рецептов',
+    )
+
+    class Meta:
+        verbose_name = 'Author stats'
+        verbose_name_plural = 'Author stats'
+
+    def __str__(self):
+        return f'{self.user}: {self.recipes_count}'
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Подписчик',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт',
+    )
+    created_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        verbose_name = 'Feed entry'
+        verbose_name_plural = 'Feed entries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'recipe'), name='unique_feed_entry')
+        ]
+        indexes = [
+            models.Index(
+                fields=('user', '-created_date', '-recipe'),
+                name='feed_entry_user_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user}: {self.recipe}'
+
+
+class ReferenceVersion(models.Model):
+    name = models.CharField(
+        max_length=50,
+        primary_key=True,
+        verbose_name='Справочник',
+    )
+    version = models.FloatField(verbose_name='Версия')
+
+    class Meta:
+        verbose_name = 'Reference version'
+        verbose_name_plural = 'Reference versions'
+
+    def __str__(self):
+        return f'{self.name}: {self.version}'
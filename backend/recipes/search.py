@@ -0,0 +1,71 @@
+import bisect
+import threading
+
+from django.conf import settings
+
+from recipes.models import Ingredient
+from recipes.versions import bump_version, get_version
+
+
+class IngredientIndex:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.index = ([], [])
+
+    def invalidate(self):
+        bump_version('ingredients')
+
+    def get_version(self):
+        return get_version('ingredients')
+
+    def build(self, version):
+        entries = sorted(
+            (
+                {'id': pk, 'name': name, 'measurement_unit': unit}
+                for pk, name, unit in Ingredient.objects.values_list(
+                    'id', 'name', 'measurement_unit'
+                ).iterator()
+            ),
+            key=lambda entry: (entry['name'].lower(), entry['id']),
+        )
+        self.index = ([entry['name'].lower() for entry in entries], entries)
+        self.version = version
+
+    def ensure_built(self, version=None):
+        if version is None:
+            version = self.get_version()
+        if self.version == version:
+            return
+        with self.lock:
+            if self.version != version:
+                self.build(version)
+
+    def search(self, query, limit=None, version=None):
+        self.ensure_built(version)
+        keys, entries = self.index
+        query = query.strip().lower()
+        if not query:
+            return list(entries)
+        if limit is None:
+            limit = settings.INGREDIENT_SEARCH_LIMIT
+        start = bisect.bisect_left(keys, query)
+        result = []
+        position = start
+        while (position < len(keys) and len(result) < limit
+               and keys[position].startswith(query)):
+            result.append(entries[position])
+            position += 1
+        prefix_end = position
+        for position, key in enumerate(keys):
+            if len(result) >= limit:
+                break
+            if start <= position < prefix_end:
+                continue
+            if query in key:
+                result.append(entries[position])
+        return result
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,131 @@
+from collections import Counter
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+
+from recipes.models import IngredientAmount, ShopCart, ShopCartIngredient
+
+BATCH_SIZE = 1000
+
+
+def recipe_amounts(recipe_id):
+    return Counter(dict(
+        IngredientAmount.objects.filter(recipe_id=recipe_id)
+        .values_list('ingredient_id')
+        .annotate(amount=Sum('amount'))
+    ))
+
+
+def bulk_create(items):
+    items = iter(items)
+    while True:
+        batch = list(islice(items, BATCH_SIZE))
+        if not batch:
+            return
+        ShopCartIngredient.objects.bulk_create(batch)
+
+
+def apply_deltas(user_ids, deltas):
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items() if delta
+    }
+    if not user_ids or not deltas:
+        return
+    with transaction.atomic():
+        items = list(
+            ShopCartIngredient.objects.select_for_update().filter(
+                user_id__in=user_ids, ingredient_id__in=deltas)
+        )
+        existing = set()
+        for item in items:
+            item.amount = F('amount') + deltas[item.ingredient_id]
+            existing.add((item.user_id, item.ingredient_id))
+        ShopCartIngredient.objects.bulk_update(
+            items, ['amount'], batch_size=BATCH_SIZE)
+        bulk_create(
+            ShopCartIngredient(
+                user_id=user_id, ingredient_id=ingredient_id, amount=delta)
+            for user_id in user_ids
+            for ingredient_id, delta in deltas.items()
+            if (user_id, ingredient_id) not in existing
+        )
+        ShopCartIngredient.objects.filter(
+            user_id__in=user_ids, ingredient_id__in=deltas, amount__lte=0
+        ).delete()
+
+
+def add_recipe(user_id, recipe_id):
+    apply_deltas([user_id], recipe_amounts(recipe_id))
+
+
+def remove_recipe(user_id, recipe_id):
+    apply_deltas([user_id], {
+        ingredient_id: -amount
+        for ingredient_id, amount in recipe_amounts(recipe_id).items()
+    })
+
+
+def update_recipe(recipe_id, old_amounts, new_amounts):
+    deltas = Counter(new_amounts)
+    deltas.subtract(old_amounts)
+    user_ids = list(
+        ShopCart.objects.filter(recipe_id=recipe_id)
+        .values_list('user_id', flat=True)
+    )
+    apply_deltas(user_ids, deltas)
+
+
+def live_totals(user_ids=None):
+    carts = Q(recipe__list_recipe__isnull=False)
+    if user_ids is not None:
+        carts = Q(recipe__list_recipe__user__in=user_ids)
+    return (
+        IngredientAmount.objects.filter(carts)
+        .values_list('recipe__list_recipe__user', 'ingredient')
+        .annotate(amount=Sum('amount'))
+        .order_by()
+    )
+
+
+def stored_totals():
+    return ShopCartIngredient.objects.values_list(
+        'user_id', 'ingredient_id', 'amount')
+
+
+def rebuild():
+    with transaction.atomic():
+        ShopCartIngredient.objects.all().delete()
+        bulk_create(
+            ShopCartIngredient(
+                user_id=user_id, ingredient_id=ingredient_id, amount=amount)
+            for user_id, ingredient_id, amount in live_totals().iterator()
+        )
+
+
+def rebuild_users(user_ids):
+    with transaction.atomic():
+        ShopCartIngredient.objects.filter(user_id__in=user_ids).delete()
+        bulk_create(
+            ShopCartIngredient(
+                user_id=user_id, ingredient_id=ingredient_id, amount=amount)
+            for user_id, ingredient_id, amount
+            in live_totals(user_ids).iterator()
+        )
+
+
+def find_mismatches():
+    live = {
+        (user_id, ingredient_id): amount
+        for user_id, ingredient_id, amount in live_totals().iterator()
+    }
+    stored = {
+        (user_id, ingredient_id): amount
+        for user_id, ingredient_id, amount in stored_totals().iterator()
+    }
+    return [
+        (key, live.get(key), stored.get(key))
+        for key in live.keys() | stored.keys()
+        if live.get(key) != stored.get(key)
+    ]
@@ -0,0 +1,136 @@
+import logging
+
+from django.db import DatabaseError, connections, transaction
+from django.db.models.signals import (m2m_changed, post_delete,
+                                      post_migrate, post_save, pre_delete)
+from django.dispatch import receiver
+from users.models import Follow
+
+from recipes import counters, feed, fulltext, shopping_list, tag_masks
+from recipes.models import Favorite, Ingredient, Recipe, ShopCart, Tag
+from recipes.versions import bump_version
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM_INDEX_SQL = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS ingredient_name_trgm_idx '
+    'ON {table} USING gin (UPPER(name) gin_trgm_ops)',
+)
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tags(sender, **kwargs):
+    bump_version('tags')
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+def invalidate_ingredients(sender, **kwargs):
+    bump_version('ingredients')
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def refresh_tags_mask(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            instance.tags_mask = tag_masks.refresh([instance.pk])[instance.pk]
+    elif action == 'post_add':
+        tag_masks.set_tag(instance.pk, Recipe.objects.filter(pk__in=pk_set))
+    elif action == 'post_remove':
+        tag_masks.unset_tag(
+            instance.pk, Recipe.objects.filter(pk__in=pk_set))
+    elif action == 'pre_clear':
+        tag_masks.unset_tag(instance.pk, Recipe.objects.filter(tags=instance))
+
+
+@receiver(pre_delete, sender=Tag)
+def remove_deleted_tag_from_masks(sender, instance, **kwargs):
+    tag_masks.unset_tag(instance.pk, Recipe.objects.filter(tags=instance))
+
+
+@receiver(post_save, sender=Recipe)
+def count_created_recipe(sender, instance, created, **kwargs):
+    if created:
+        counters.change_recipes_count(instance.author_id, 1)
+
+
+@receiver(post_save, sender=Recipe)
+def publish_created_recipe(sender, instance, created, **kwargs):
+    if created:
+        feed.add_recipe(instance)
+
+
+@receiver(post_save, sender=Follow)
+def add_author_to_feed(sender, instance, created, **kwargs):
+    if created:
+        feed.add_authors(instance.user_id, [instance.following_id])
+
+
+@receiver(post_delete, sender=Follow)
+def remove_author_from_feed(sender, instance, **kwargs):
+    feed.remove_authors(instance.user_id, [instance.following_id])
+
+
+@receiver(post_delete, sender=Recipe)
+def count_deleted_recipe(sender, instance, **kwargs):
+    counters.change_recipes_count(instance.author_id, -1)
+
+
+@receiver(post_save, sender=Favorite)
+def count_created_favorite(sender, instance, created, **kwargs):
+    if created:
+        counters.change_recipe_counter(
+            [instance.recipe_id], 'favorites_count', 1)
+
+
+@receiver(post_delete, sender=Favorite)
+def count_deleted_favorite(sender, instance, **kwargs):
+    counters.change_recipe_counter(
+        [instance.recipe_id], 'favorites_count', -1)
+
+
+@receiver(post_save, sender=ShopCart)
+def add_recipe_to_shopping_list(sender, instance, created, **kwargs):
+    if created:
+        shopping_list.add_recipe(instance.user_id, instance.recipe_id)
+        counters.change_recipe_counter([instance.recipe_id], 'cart_count', 1)
+
+
+@receiver(post_delete, sender=ShopCart)
+def count_deleted_cart(sender, instance, **kwargs):
+    counters.change_recipe_counter([instance.recipe_id], 'cart_count', -1)
+
+
+@receiver(pre_delete, sender=ShopCart)
+def remove_recipe_from_shopping_list(sender, instance, **kwargs):
+    shopping_list.remove_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_migrate)
+def create_ingredient_trigram_index(sender, using, **kwargs):
+    connection = connections[using]
+    if sender.name != 'recipes' or connection.vendor != 'postgresql':
+        return
+    table = connection.ops.quote_name(Ingredient._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning(
+                'Расширение pg_trgm недоступно, триграммный индекс '
+                'ингредиентов не создан')
+            return
+        try:
+            with transaction.atomic(using=using):
+                for statement in TRIGRAM_INDEX_SQL:
+                    cursor.execute(statement.format(table=table))
+        except DatabaseError as error:
+            logger.warning(
+                'Не удалось создать триграммный индекс ингредиентов: %s',
+                error)
+
+
+@receiver(post_migrate)
+def install_recipe_search(sender, using, **kwargs):
+    if sender.name == 'recipes':
+        fulltext.install(using)
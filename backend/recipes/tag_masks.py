@@ -0,0 +1,56 @@
+from django.db.models import F
+
+from recipes.models import Recipe
+
+MAX_TAG_ID = 63
+BATCH_SIZE = 1000
+
+
+def tag_bit(tag_id):
+    return 1 << (tag_id - 1)
+
+
+def fits(tag_ids):
+    return all(0 < tag_id <= MAX_TAG_ID for tag_id in tag_ids)
+
+
+def tags_mask(tag_ids):
+    mask = 0
+    for tag_id in tag_ids:
+        if fits((tag_id,)):
+            mask |= tag_bit(tag_id)
+    return mask
+
+
+def refresh(recipe_ids):
+    masks = dict.fromkeys(recipe_ids, 0)
+    for recipe_id, tag_id in Recipe.tags.through.objects.filter(
+        recipe_id__in=recipe_ids, tag_id__lte=MAX_TAG_ID
+    ).values_list('recipe_id', 'tag_id'):
+        masks[recipe_id] |= tag_bit(tag_id)
+    Recipe.objects.bulk_update(
+        [
+            Recipe(id=recipe_id, tags_mask=mask)
+            for recipe_id, mask in masks.items()
+        ],
+        ['tags_mask'],
+        batch_size=BATCH_SIZE,
+    )
+    return masks
+
+
+def set_tag(tag_id, recipes):
+    if fits((tag_id,)):
+        recipes.update(tags_mask=F('tags_mask').bitor(tag_bit(tag_id)))
+
+
+def unset_tag(tag_id, recipes):
+    if fits((tag_id,)):
+        recipes.update(tags_mask=F('tags_mask').bitand(~tag_bit(tag_id)))
+
+
+def rebuild():
+    recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+    for start in range(0, len(recipe_ids), BATCH_SIZE):
+        refresh(recipe_ids[start:start + BATCH_SIZE])
+    return len(recipe_ids)
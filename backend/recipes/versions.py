@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from recipes.models import ReferenceVersion
+
+VERSION_KEY = 'reference_version:{}'
+
+
+def get_version(name):
+    key = VERSION_KEY.format(name)
+    version = cache.get(key)
+    if version is not None:
+        return version
+    version = ReferenceVersion.objects.filter(
+        name=name).values_list('version', flat=True).first()
+    if version is None:
+        version = ReferenceVersion.objects.get_or_create(
+            name=name, defaults={'version': time.time()})[0].version
+    cache.set(key, version, settings.REFERENCE_VERSION_TIMEOUT)
+    return version
+
+
+def bump_version(name):
+    key = VERSION_KEY.format(name)
+    version = time.time()
+    ReferenceVersion.objects.update_or_create(
+        name=name, defaults={'version': version})
+    cache.delete(key)
+    transaction.on_commit(
+        lambda: cache.set(key, version, settings.REFERENCE_VERSION_TIMEOUT))
@@ -0,0 +1,81 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from recipes.models import Ingredient, IngredientAmount, Recipe, Tag
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def make_user(db):
+    numbers = iter(range(1, 1000))
+
+    def make():
+        number = next(numbers)
+        return User.objects.create_user(
+            username=f'user{number}',
+            email=f'user{number}@example.com',
+            password='Pass12345!',
+            first_name='Имя',
+            last_name='Фамилия',
+        )
+    return make
+
+
+@pytest.fixture
+def client_for():
+    def make(user=None):
+        client = APIClient()
+        if user is not None:
+            token, _ = Token.objects.get_or_create(user=user)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+        return client
+    return make
+
+
+@pytest.fixture
+def world(db, make_user):
+    tags = [
+        Tag.objects.create(name=f'Тег {number}', color=f'#00000{number}',
+                           slug=f'tag{number}')
+        for number in range(3)
+    ]
+    ingredients = [
+        Ingredient.objects.create(name=f'Продукт {number}',
+                                  measurement_unit='г')
+        for number in range(10)
+    ]
+    users = [make_user() for _ in range(4)]
+    recipes = []
+    for number in range(12):
+        recipe = Recipe.objects.create(
+            author=users[number % 4], name=f'Рецепт {number}',
+            text='Описание', cooking_time=5, image='recipes/image.jpg',
+        )
+        recipe.tags.set(tags[:number % 3 + 1])
+        for offset in range(3):
+            IngredientAmount.objects.create(
+                recipe=recipe,
+                ingredient=ingredients[(number + offset) % 10],
+                amount=offset + 1,
+            )
+        recipes.append(recipe)
+    return {
+        'tags': tags, 'ingredients': ingredients,
+        'users': users, 'recipes': recipes,
+    }
@@ -0,0 +1,39 @@
+import pytest
+from django.db import connection
+
+from api.pagination import EstimatedCountPaginator
+from recipes.models import Recipe
+
+postgres_only = pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='оценка числа строк есть только в PostgreSQL')
+
+
+@pytest.fixture
+def admin_client_for(client, make_user):
+    user = make_user()
+    user.is_staff = user.is_superuser = True
+    user.save()
+    client.force_login(user)
+    return client
+
+
+@postgres_only
+def test_estimated_count_uses_plan(world, settings):
+    settings.ADMIN_COUNT_ESTIMATE_THRESHOLD = 1
+    queryset = Recipe.objects.filter(name__startswith='Рецепт')
+    count = EstimatedCountPaginator(queryset, 10).count
+    assert isinstance(count, int) and count >= 1
+
+
+def test_estimated_count_below_threshold_is_exact(world, settings):
+    settings.ADMIN_COUNT_ESTIMATE_THRESHOLD = 10 ** 9
+    assert EstimatedCountPaginator(Recipe.objects.all(), 10).count == 12
+
+
+@pytest.mark.parametrize('threshold', [1, 10 ** 9])
+def test_recipe_changelist(world, admin_client_for, settings, threshold):
+    settings.ADMIN_COUNT_ESTIMATE_THRESHOLD = threshold
+    response = admin_client_for.get('/admin/recipes/recipe/')
+    assert response.status_code == 200
+    assert 'Рецепт 0' in response.content.decode()
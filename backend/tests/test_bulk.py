@@ -0,0 +1,55 @@
+import pytest
+
+from recipes import shopping_list
+from recipes.models import Favorite, FeedEntry, Recipe, ShopCart
+from users.models import Follow
+
+
+@pytest.mark.parametrize('url, model, counter', [
+    ('bulk_favorite', Favorite, 'favorites_count'),
+    ('bulk_shopping_cart', ShopCart, 'cart_count'),
+])
+def test_bulk_remove_recipes(world, client_for, make_user, url, model,
+                             counter):
+    user, other = make_user(), make_user()
+    recipes = world['recipes'][:4]
+    ids = [recipe.id for recipe in recipes]
+    client = client_for(user)
+    client.post(f'/api/recipes/{url}/', {'recipes': ids}, format='json')
+    model.objects.create(user=other, recipe=recipes[0])
+    response = client.delete(
+        f'/api/recipes/{url}/', {'recipes': ids[:3]}, format='json')
+    assert response.status_code == 204, response.content
+    assert list(model.objects.filter(user=user).values_list(
+        'recipe_id', flat=True)) == [ids[3]]
+    assert model.objects.filter(user=other).count() == 1
+    counts = dict(Recipe.objects.filter(
+        pk__in=ids).values_list('id', counter))
+    assert counts == {ids[0]: 1, ids[1]: 0, ids[2]: 0, ids[3]: 1}
+    assert shopping_list.find_mismatches() == []
+
+
+def test_bulk_unfollow(world, client_for, make_user):
+    user = make_user()
+    authors = world['users']
+    ids = [author.id for author in authors]
+    client = client_for(user)
+    response = client.post(
+        '/api/users/bulk_subscribe/', {'authors': ids}, format='json')
+    assert response.status_code == 201, response.content
+    assert FeedEntry.objects.filter(user=user).count() == 12
+    response = client.delete(
+        '/api/users/bulk_subscribe/', {'authors': ids[:2]}, format='json')
+    assert response.status_code == 204, response.content
+    assert set(Follow.objects.filter(user=user).values_list(
+        'following_id', flat=True)) == set(ids[2:])
+    assert set(FeedEntry.objects.filter(user=user).values_list(
+        'recipe__author_id', flat=True)) == set(ids[2:])
+
+
+def test_bulk_remove_empty(world, client_for, make_user):
+    client = client_for(make_user())
+    for url, field in (('/api/recipes/bulk_favorite/', 'recipes'),
+                       ('/api/users/bulk_subscribe/', 'authors')):
+        response = client.delete(url, {field: []}, format='json')
+        assert response.status_code == 204, response.content
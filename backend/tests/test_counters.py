@@ -0,0 +1,33 @@
+from api.serializers import CreateRecipeSerializer
+from recipes.models import Favorite, Recipe, ShopCart
+from recipes.tag_masks import tags_mask
+
+
+def test_stale_save_keeps_counters(world, make_user):
+    recipe = world['recipes'][0]
+    stale = Recipe.objects.get(pk=recipe.pk)
+    Favorite.objects.create(user=make_user(), recipe=recipe)
+    ShopCart.objects.create(user=make_user(), recipe=recipe)
+    stale.name = 'Новое название'
+    stale.save()
+    recipe = Recipe.objects.get(pk=recipe.pk)
+    assert recipe.name == 'Новое название'
+    assert (recipe.favorites_count, recipe.cart_count) == (1, 1)
+    assert recipe.tags_mask == tags_mask([world['tags'][0].id])
+
+
+def test_stale_serializer_update_keeps_counters(world, make_user):
+    recipe = world['recipes'][0]
+    stale = Recipe.objects.get(pk=recipe.pk)
+    Favorite.objects.create(user=make_user(), recipe=recipe)
+    serializer = CreateRecipeSerializer(stale, data={
+        'name': 'Новое название',
+        'cooking_time': 7,
+        'tags': [world['tags'][1].id],
+        'ingredients': [{'id': world['ingredients'][0].id, 'amount': 5}],
+    }, partial=True)
+    assert serializer.is_valid(), serializer.errors
+    serializer.save()
+    recipe = Recipe.objects.get(pk=recipe.pk)
+    assert recipe.favorites_count == 1
+    assert recipe.tags_mask == tags_mask([world['tags'][1].id])
@@ -0,0 +1,91 @@
+import pytest
+
+from recipes import feed
+from recipes.models import FeedEntry, Recipe
+from users.models import Follow
+
+FEED_QUERIES = 5
+
+
+def stored():
+    return set(FeedEntry.objects.values_list('user_id', 'recipe_id'))
+
+
+def live():
+    return {
+        (user_id, recipe_id)
+        for user_id, recipe_id, _ in feed.live_entries()
+    }
+
+
+def feed_ids(client):
+    response = client.get('/api/recipes/feed/?limit=50')
+    assert response.status_code == 200
+    return [item['id'] for item in response.json()['results']]
+
+
+def authored(world, author):
+    return [
+        recipe.id for recipe in reversed(world['recipes'])
+        if recipe.author_id == author.id
+    ]
+
+
+def test_follow_and_unfollow(world, make_user, client_for):
+    user = make_user()
+    client = client_for(user)
+    author = world['users'][1]
+    assert client.post(
+        f'/api/users/{author.id}/subscribe/').status_code == 201
+    assert feed_ids(client) == authored(world, author)
+    assert stored() == live()
+    assert client.delete(
+        f'/api/users/{author.id}/subscribe/').status_code == 204
+    assert feed_ids(client) == []
+    assert stored() == live() == set()
+
+
+def test_recipe_create_reaches_followers(world, make_user, client_for):
+    follower, stranger = make_user(), make_user()
+    author = world['users'][0]
+    Follow.objects.create(user=follower, following=author)
+    recipe = Recipe.objects.create(
+        author=author, name='Новый рецепт', text='Описание',
+        cooking_time=5, image='recipes/image.jpg',
+    )
+    assert feed_ids(client_for(follower))[0] == recipe.id
+    assert feed_ids(client_for(stranger)) == []
+    assert stored() == live()
+
+
+def test_recipe_delete_leaves_feed(world, make_user, client_for):
+    follower = make_user()
+    author = world['users'][0]
+    Follow.objects.create(user=follower, following=author)
+    recipe = world['recipes'][4]
+    recipe.delete()
+    assert recipe.id not in feed_ids(client_for(follower))
+    assert stored() == live()
+
+
+def test_rebuild(world, make_user):
+    users = [make_user() for _ in range(2)]
+    for user in users:
+        for author in world['users'][:2]:
+            Follow.objects.create(user=user, following=author)
+    FeedEntry.objects.filter(user=users[0]).delete()
+    feed.rebuild([users[0].id])
+    assert stored() == live()
+
+
+@pytest.mark.parametrize('authors', [1, 4])
+def test_feed_queries(world, make_user, client_for,
+                      django_assert_num_queries, authors):
+    user = make_user()
+    for author in world['users'][:authors]:
+        Follow.objects.create(user=user, following=author)
+    client = client_for(user)
+    with django_assert_num_queries(FEED_QUERIES):
+        response = client.get('/api/recipes/feed/?limit=3')
+    assert response.status_code == 200
+    assert len(response.json()['results']) == 3
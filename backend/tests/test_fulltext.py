@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+
+from recipes.models import Recipe
+
+CORPUS = (
+    ('Борщ украинский', 'Свёкла, капуста и говядина'),
+    ('Свекольник', 'Холодный суп со свёклой'),
+    ('Куриный суп', 'Курица, лапша и морковь'),
+    ('Салат с курицей', 'Курица, огурцы и соус'),
+    ('Tomato soup', 'Tomatoes, basil and cream'),
+)
+QUERIES = (
+    ('борщ', {'Борщ украинский'}),
+    ('БОРЩ', {'Борщ украинский'}),
+    ('свек', {'Свекольник'}),
+    ('суп', {'Свекольник', 'Куриный суп'}),
+    ('курица лапша', {'Куриный суп'}),
+    ('кур', {'Куриный суп', 'Салат с курицей'}),
+    ('tomato', {'Tomato soup'}),
+    ('soup, cream!', {'Tomato soup'}),
+    ('пицца', set()),
+)
+
+
+@pytest.fixture
+def corpus(make_user):
+    author = make_user()
+    for name, text in CORPUS:
+        Recipe.objects.create(
+            author=author, name=name, text=text, cooking_time=10)
+
+
+@pytest.mark.parametrize('vendor', ['sqlite', 'postgresql'])
+@pytest.mark.parametrize('query, expected', QUERIES)
+def test_search_backends_agree(corpus, client_for, vendor, query, expected):
+    if connection.vendor != vendor:
+        pytest.skip(f'тест для {vendor}')
+    response = client_for().get(
+        '/api/recipes/', {'search': query, 'limit': 10})
+    assert response.status_code == 200
+    assert {recipe['name'] for recipe in response.json()['results']} == (
+        expected)
+
+
+@pytest.mark.parametrize('vendor', ['sqlite', 'postgresql'])
+def test_name_match_ranks_first(corpus, make_user, client_for, vendor):
+    if connection.vendor != vendor:
+        pytest.skip(f'тест для {vendor}')
+    Recipe.objects.create(
+        author=make_user(), name='Окрошка', text='Почти как борщ',
+        cooking_time=10)
+    response = client_for().get('/api/recipes/', {'search': 'борщ'})
+    assert [recipe['name'] for recipe in response.json()['results']] == [
+        'Борщ украинский', 'Окрошка']
@@ -0,0 +1,65 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes import counters, shopping_list
+from recipes.management.commands.generate_dataset import PREFIX, Command
+from recipes.models import (Favorite, FeedEntry, Ingredient, Recipe, ShopCart,
+                            Tag)
+from users.models import Follow
+
+
+def generate(users, recipes):
+    call_command(
+        'generate_dataset', users=users, recipes=recipes, tags=3,
+        ingredients=30, favorites=recipes * 2, carts=users, follows=users,
+        stdout=io.StringIO(),
+    )
+
+
+def clear():
+    command = Command(stdout=io.StringIO())
+    with CaptureQueriesContext(connection) as context:
+        command.clear()
+    return len(context.captured_queries)
+
+
+def test_generated_recipes_use_only_synthetic_tags(world):
+    generate(10, 30)
+    real_tags = [tag.id for tag in world['tags']]
+    assert not Recipe.objects.filter(
+        author__username__startswith=f'{PREFIX}_', tags__in=real_tags
+    ).exists()
+
+
+@pytest.mark.parametrize('users, recipes', [(10, 30), (40, 120)])
+def test_clear_keeps_real_data(world, client_for, users, recipes):
+    generate(users, recipes)
+    real_user = world['users'][0]
+    synthetic_recipe = Recipe.objects.filter(
+        author__username__startswith=f'{PREFIX}_').first()
+    Favorite.objects.create(user=real_user, recipe=synthetic_recipe)
+    ShopCart.objects.create(user=real_user, recipe=synthetic_recipe)
+    Follow.objects.create(
+        user=real_user, following=synthetic_recipe.author)
+    synthetic_user = synthetic_recipe.author
+    Favorite.objects.create(user=synthetic_user, recipe=world['recipes'][0])
+
+    queries = clear()
+
+    assert queries <= 60
+    assert not Recipe.objects.filter(
+        author__username__startswith=f'{PREFIX}_').exists()
+    assert not Tag.objects.filter(slug__startswith=f'{PREFIX}_').exists()
+    assert not Ingredient.objects.filter(
+        name__startswith=f'{PREFIX} ').exists()
+    assert Recipe.objects.count() == 12
+    assert Tag.objects.count() == 3
+    assert not Follow.objects.filter(user=real_user).exists()
+    assert not FeedEntry.objects.filter(user=real_user).exists()
+    assert counters.recipe_mismatches() == []
+    assert shopping_list.find_mismatches() == []
+    assert Recipe.objects.get(pk=world['recipes'][0].pk).favorites_count == 0
@@ -0,0 +1,83 @@
+import io
+import time
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import connection, connections
+from PIL import Image
+
+from recipes.images import executor, generate_variants, schedule_variants
+from recipes.models import Recipe
+
+
+@pytest.fixture
+def recipe(world):
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 600)).save(buffer, 'JPEG')
+    recipe = world['recipes'][0]
+    recipe.image = default_storage.save(
+        'recipes/photo.jpg', ContentFile(buffer.getvalue()))
+    recipe.save()
+    return recipe
+
+
+def variants_of(client, recipe):
+    response = client.get(f'/api/recipes/{recipe.id}/')
+    return response.json()['image_variants'], response.json()['image']
+
+
+def test_serialization_does_not_touch_storage(world, client_for,
+                                              monkeypatch):
+    def exists(self, name):
+        raise AssertionError(f'storage.exists({name}) при сериализации')
+
+    monkeypatch.setattr(FileSystemStorage, 'exists', exists)
+    response = client_for().get('/api/recipes/?limit=12')
+    assert response.status_code == 200
+    assert all(item['image_variants'] for item in response.json()['results'])
+
+
+def test_variants_served_once_generated(recipe, client_for):
+    client = client_for()
+    variants, image = variants_of(client, recipe)
+    assert set(variants.values()) == {image}
+    generate_variants(recipe.image.name)
+    variants, image = variants_of(client, recipe)
+    assert image not in variants.values()
+    for url in variants.values():
+        assert default_storage.exists(url.split('/media/', 1)[1])
+
+
+def test_new_image_resets_readiness(recipe):
+    generate_variants(recipe.image.name)
+    recipe.refresh_from_db()
+    assert recipe.image_variants_ready
+    schedule_variants(recipe)
+    assert not recipe.image_variants_ready
+    assert not Recipe.objects.get(pk=recipe.pk).image_variants_ready
+
+
+def wait_until_ready(recipe, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if Recipe.objects.get(pk=recipe.pk).image_variants_ready:
+            return True
+        time.sleep(0.05)
+    return False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_worker_generates_variants_after_commit(make_user):
+    buffer = io.BytesIO()
+    Image.new('RGB', (800, 600)).save(buffer, 'JPEG')
+    recipe = Recipe.objects.create(
+        author=make_user(), name='Рецепт', text='Описание', cooking_time=5,
+        image=default_storage.save(
+            'recipes/worker.jpg', ContentFile(buffer.getvalue())),
+    )
+    schedule_variants(recipe)
+    assert wait_until_ready(recipe)
+    if connection.vendor != 'sqlite':
+        assert executor.submit(
+            lambda: connections['default'].connection).result() is None
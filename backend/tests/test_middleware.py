@@ -0,0 +1,79 @@
+import json
+import logging
+import re
+
+import pytest
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+
+from foodgram.middleware import SQLProfilingMiddleware
+from recipes.models import Tag
+
+LOGGER = 'foodgram.slow_requests'
+
+
+@pytest.fixture
+def profiling(settings):
+    settings.SQL_PROFILING = True
+    settings.SQL_PROFILING_SLOW_MS = 10 ** 6
+    settings.SQL_PROFILING_SLOW_QUERIES = 10 ** 6
+    return settings
+
+
+def timings(response):
+    return set(re.findall(r'(\w+);dur=', response['Server-Timing']))
+
+
+def test_disabled_by_default(settings, world, client_for):
+    settings.SQL_PROFILING = False
+    with pytest.raises(MiddlewareNotUsed):
+        SQLProfilingMiddleware(lambda request: HttpResponse())
+    response = client_for().get('/api/recipes/')
+    assert not response.has_header('Server-Timing')
+
+
+def test_server_timing_header(profiling, world, client_for, caplog):
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        response = client_for(world['users'][0]).get('/api/recipes/')
+    assert response.status_code == 200
+    assert timings(response) == {'total', 'sql', 'app', 'render'}
+    assert 'queries, 0 repeated' in response['Server-Timing']
+    assert not [
+        record for record in caplog.records if record.name == LOGGER]
+
+
+def test_slow_request_logged(profiling, world, client_for, caplog):
+    profiling.SQL_PROFILING_SLOW_QUERIES = 1
+    user = world['users'][0]
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        response = client_for(user).get('/api/recipes/?limit=3')
+    records = [record for record in caplog.records if record.name == LOGGER]
+    assert len(records) == 1
+    entry = json.loads(records[0].getMessage())
+    assert entry['method'] == 'GET'
+    assert entry['path'] == '/api/recipes/?limit=3'
+    assert entry['status'] == 200
+    assert entry['user'] == user.id
+    assert entry['queries'] >= 1
+    assert set(entry['timings_ms']) == timings(response)
+    assert isinstance(entry['repeated'], list)
+
+
+def test_repeated_statements_reported(profiling, db, rf, caplog):
+    profiling.SQL_PROFILING_SLOW_QUERIES = 1
+
+    def view(request):
+        for _ in range(3):
+            Tag.objects.filter(slug='missing').exists()
+        return HttpResponse()
+
+    with caplog.at_level(logging.WARNING, logger=LOGGER):
+        response = SQLProfilingMiddleware(view)(rf.get('/'))
+    assert 'sql;dur=' in response['Server-Timing']
+    assert '3 queries, 1 repeated' in response['Server-Timing']
+    entry = json.loads([
+        record for record in caplog.records if record.name == LOGGER
+    ][0].getMessage())
+    assert entry['user'] is None
+    assert len(entry['repeated']) == 1
+    assert entry['repeated'][0]['count'] == 3
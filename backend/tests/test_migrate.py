@@ -0,0 +1,29 @@
+import pytest
+from django.apps import apps
+from django.db import connection
+
+from recipes.signals import create_ingredient_trigram_index
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'postgresql',
+    reason='индекс есть только в PostgreSQL')
+def test_trigram_index_never_breaks_migrate(db, caplog):
+    create_ingredient_trigram_index(
+        sender=apps.get_app_config('recipes'), using='default')
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        available = cursor.fetchone() is not None
+        cursor.execute(
+            "SELECT 1 FROM pg_indexes "
+            "WHERE indexname = 'ingredient_name_trgm_idx'")
+        created = cursor.fetchone() is not None
+    assert created == available
+    if not available:
+        assert 'pg_trgm' in caplog.text
+
+
+def test_ingredient_prefix_search_works(world, client_for):
+    response = client_for().get('/api/ingredients/', {'name': 'продукт 3'})
+    assert [entry['name'] for entry in response.json()] == ['Продукт 3']
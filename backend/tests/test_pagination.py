@@ -0,0 +1,59 @@
+import pytest
+
+from recipes.models import Recipe
+
+
+def walk(client, url):
+    ids = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200, response.content
+        ids.extend(recipe['id'] for recipe in response.json()['results'])
+        url = response.json()['next']
+        pages += 1
+    return ids, pages
+
+
+def test_cursor_walk_has_no_gaps(world, client_for):
+    Recipe.objects.filter(
+        pk__in=[recipe.id for recipe in world['recipes'][:6]]
+    ).update(created_date=world['recipes'][0].created_date)
+    client = client_for()
+    ids, pages = walk(client, '/api/recipes/?pagination=cursor&limit=5')
+    expected = list(
+        Recipe.objects.order_by('-created_date', '-id')
+        .values_list('id', flat=True)
+    )
+    assert ids == expected
+    assert len(set(ids)) == 12
+    assert pages == 3
+
+
+def test_cursor_walk_with_filter(world, client_for):
+    tag = world['tags'][2]
+    ids, _ = walk(
+        client_for(),
+        f'/api/recipes/?pagination=cursor&limit=2&tags={tag.slug}')
+    assert ids == list(
+        Recipe.objects.filter(tags=tag).order_by('-created_date', '-id')
+        .values_list('id', flat=True)
+    )
+
+
+@pytest.mark.parametrize('cursor', ['broken', 'MjAyMXxhYmM=', '!!!'])
+def test_invalid_cursor(world, client_for, cursor):
+    response = client_for().get('/api/recipes/', {'cursor': cursor})
+    assert response.status_code == 400
+    assert 'cursor' in response.json()
+
+
+def test_cursor_count(world, client_for):
+    client = client_for()
+    data = client.get('/api/recipes/?pagination=cursor&limit=5').json()
+    assert 'count' not in data
+    data = client.get(
+        '/api/recipes/?pagination=cursor&limit=5&count=1').json()
+    assert data['count'] == 12
+    next_page = client.get(data['next']).json()
+    assert next_page['count'] == 12
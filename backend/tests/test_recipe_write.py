@@ -0,0 +1,134 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+from recipes.models import Ingredient, IngredientAmount
+
+CREATE_QUERIES = 17
+UPDATE_QUERIES = 18
+
+
+def image_data():
+    buffer = io.BytesIO()
+    Image.new('RGB', (2, 2)).save(buffer, 'PNG')
+    return ('data:image/png;base64,'
+            + base64.b64encode(buffer.getvalue()).decode())
+
+
+@pytest.fixture
+def ingredient_ids(db):
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f'Продукт для записи {number}', measurement_unit='г')
+        for number in range(60)
+    )
+    return list(
+        Ingredient.objects.filter(name__startswith='Продукт для записи')
+        .order_by('id').values_list('id', flat=True)
+    )
+
+
+def payload(world, ingredient_ids, amount):
+    return {
+        'name': 'Новый рецепт',
+        'text': 'Описание',
+        'cooking_time': 10,
+        'image': image_data(),
+        'tags': [tag.id for tag in world['tags']],
+        'ingredients': [
+            {'id': pk, 'amount': amount} for pk in ingredient_ids],
+    }
+
+
+@pytest.mark.parametrize('size', [3, 30])
+def test_create_recipe_queries(world, client_for, ingredient_ids,
+                               django_assert_max_num_queries, size):
+    client = client_for(world['users'][0])
+    data = payload(world, ingredient_ids[:size], 1)
+    with django_assert_max_num_queries(CREATE_QUERIES):
+        response = client.post('/api/recipes/', data, format='json')
+    assert response.status_code == 201, response.content
+    assert IngredientAmount.objects.filter(
+        recipe_id=response.json()['id']).count() == size
+
+
+@pytest.mark.parametrize('size', [3, 30])
+def test_update_recipe_queries(world, client_for, ingredient_ids,
+                               django_assert_max_num_queries, size):
+    client = client_for(world['users'][0])
+    recipe_id = client.post(
+        '/api/recipes/', payload(world, ingredient_ids[:size], 1),
+        format='json',
+    ).json()['id']
+    kept = size // 3
+    new_ids = ingredient_ids[size - kept:2 * size - kept]
+    data = payload(world, new_ids, 2)
+    del data['image']
+    with django_assert_max_num_queries(UPDATE_QUERIES):
+        response = client.patch(
+            f'/api/recipes/{recipe_id}/', data, format='json')
+    assert response.status_code == 200, response.content
+    assert dict(
+        IngredientAmount.objects.filter(recipe_id=recipe_id)
+        .values_list('ingredient_id', 'amount')
+    ) == dict.fromkeys(new_ids, 2)
+
+
+@pytest.mark.parametrize('field', ['tags', 'ingredients'])
+def test_missing_ids_reported_together(world, client_for, ingredient_ids,
+                                       django_assert_max_num_queries, field):
+    client = client_for(world['users'][0])
+    data = payload(world, ingredient_ids[:3], 1)
+    missing = [999998, 999999]
+    if field == 'tags':
+        data['tags'] += missing
+    else:
+        data['ingredients'] += [{'id': pk, 'amount': 1} for pk in missing]
+    with django_assert_max_num_queries(4):
+        response = client.post('/api/recipes/', data, format='json')
+    assert response.status_code == 400
+    assert response.json()[field] == [
+        'Недопустимые id: 999998, 999999 - объекты не существуют.']
+
+
+@pytest.mark.parametrize('value', [True, 1.0, 1.5, None, [1], {'id': 1}])
+def test_tag_id_type_rejected(world, client_for, ingredient_ids, value):
+    data = payload(world, ingredient_ids[:3], 1)
+    data['tags'] = [value]
+    response = client_for(world['users'][0]).post(
+        '/api/recipes/', data, format='json')
+    assert response.status_code == 400
+    assert response.json()['tags'] == ['Некорректный тип. Ожидался id.']
+
+
+@pytest.mark.parametrize('value', [True, 1.0, '1.0', 'abc'])
+def test_bulk_id_type_rejected(world, client_for, value):
+    response = client_for(world['users'][0]).post(
+        '/api/recipes/bulk_favorite/', {'recipes': [value]}, format='json')
+    assert response.status_code == 400
+    assert response.json()['recipes'] == ['Некорректный тип. Ожидался id.']
+
+
+def test_bulk_id_as_string(world, client_for):
+    recipe = world['recipes'][1]
+    response = client_for(world['users'][0]).post(
+        '/api/recipes/bulk_favorite/',
+        {'recipes': [str(recipe.id)]},
+        format='json',
+    )
+    assert response.status_code == 201, response.content
+    assert response.json()['recipes'] == [recipe.id]
+
+
+def test_bulk_max_length(world, client_for, settings):
+    response = client_for(world['users'][0]).post(
+        '/api/recipes/bulk_favorite/',
+        {'recipes': list(range(1, settings.BULK_ACTION_MAX_ITEMS + 2))},
+        format='json',
+    )
+    assert response.status_code == 400
+    assert response.json()['recipes'] == [
+        f'Не больше {settings.BULK_ACTION_MAX_ITEMS} элементов '
+        'за один запрос.'
+    ]
@@ -0,0 +1,60 @@
+import pytest
+
+from recipes.models import Favorite, ShopCart
+
+
+@pytest.fixture
+def user(world):
+    user = world['users'][0]
+    Favorite.objects.create(user=user, recipe=world['recipes'][0])
+    ShopCart.objects.create(user=user, recipe=world['recipes'][1])
+    return user
+
+
+@pytest.mark.parametrize('limit', [6, 12])
+@pytest.mark.parametrize('authenticated, queries', [(False, 4), (True, 6)])
+def test_recipe_list_queries(user, client_for, django_assert_max_num_queries,
+                             limit, authenticated, queries):
+    client = client_for(user if authenticated else None)
+    with django_assert_max_num_queries(queries):
+        response = client.get(f'/api/recipes/?limit={limit}')
+    assert response.status_code == 200
+    assert len(response.json()['results']) == limit
+
+
+@pytest.mark.parametrize('authenticated, queries', [(False, 3), (True, 5)])
+def test_recipe_detail_queries(world, user, client_for,
+                               django_assert_max_num_queries,
+                               authenticated, queries):
+    client = client_for(user if authenticated else None)
+    recipe = world['recipes'][0]
+    with django_assert_max_num_queries(queries):
+        response = client.get(f'/api/recipes/{recipe.id}/')
+    assert response.status_code == 200
+    assert response.json()['is_favorited'] is authenticated
+    assert len(response.json()['ingredients']) == 3
+
+
+@pytest.mark.parametrize('url', ['favorite', 'shopping_cart'])
+def test_add_relation_returns_recipe_id(world, client_for, make_user, url):
+    recipe = world['recipes'][0]
+    response = client_for(make_user()).post(
+        f'/api/recipes/{recipe.id}/{url}/')
+    assert response.status_code == 201, response.content
+    assert response.json()['recipe'] == recipe.id
+
+
+@pytest.mark.parametrize('url', ['favorite', 'shopping_cart'])
+def test_add_relation_missing_recipe(world, client_for, make_user, url):
+    response = client_for(make_user()).post(f'/api/recipes/999999/{url}/')
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize('url', ['favorite', 'shopping_cart'])
+def test_add_relation_twice(world, client_for, make_user, url):
+    client = client_for(make_user())
+    recipe = world['recipes'][0]
+    assert client.post(f'/api/recipes/{recipe.id}/{url}/').status_code == 201
+    response = client.post(f'/api/recipes/{recipe.id}/{url}/')
+    assert response.status_code == 400
+    assert 'error' in response.json()
@@ -0,0 +1,82 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from recipes.models import Ingredient, ReferenceVersion, Tag
+from recipes.search import ingredient_index
+from recipes.versions import VERSION_KEY, bump_version
+
+
+def bump_in_database(name):
+    version = ReferenceVersion.objects.get(name=name).version
+    ReferenceVersion.objects.filter(name=name).update(version=version + 1)
+
+
+def test_not_modified_without_queries(world, client_for,
+                                      django_assert_num_queries):
+    client = client_for()
+    etag = client.get('/api/tags/')['ETag']
+    with django_assert_num_queries(0):
+        response = client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+
+
+def test_bump_through_shared_cache(world, client_for):
+    client = client_for()
+    etag = client.get('/api/tags/')['ETag']
+    Tag.objects.bulk_create([Tag(name='Новый', color='#111111', slug='new')])
+    bump_version('tags')
+    response = client.get('/api/tags/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response['ETag'] != etag
+    assert 'new' in [tag['slug'] for tag in response.json()]
+
+
+def test_database_version_read_after_cache_expiry(world, client_for):
+    client = client_for()
+    etag = client.get('/api/tags/')['ETag']
+    bump_in_database('tags')
+    assert client.get('/api/tags/')['ETag'] == etag
+    cache.delete(VERSION_KEY.format('tags'))
+    assert client.get('/api/tags/')['ETag'] != etag
+
+
+def test_tag_save_changes_etag(world, client_for):
+    client = client_for()
+    etag = client.get('/api/tags/')['ETag']
+    tag = world['tags'][0]
+    tag.name = 'Переименован'
+    tag.save()
+    assert client.get('/api/tags/')['ETag'] != etag
+
+
+def test_ingredient_index_follows_shared_version(world):
+    assert ingredient_index.search('Свёкла') == []
+    Ingredient.objects.bulk_create(
+        [Ingredient(name='Свёкла', measurement_unit='г')])
+    bump_version('ingredients')
+    assert [entry['name'] for entry in ingredient_index.search('Свёкла')] == [
+        'Свёкла']
+
+
+def test_ingredient_search_reads_version_once(world, client_for, settings):
+    settings.REFERENCE_VERSION_TIMEOUT = 0
+    client = client_for()
+    with CaptureQueriesContext(connection) as context:
+        response = client.get('/api/ingredients/', {'name': 'Продукт 1'})
+    assert response.status_code == 200
+    assert [entry['name'] for entry in response.json()] == ['Продукт 1']
+    version_queries = [
+        query for query in context.captured_queries
+        if ReferenceVersion._meta.db_table in query['sql']
+    ]
+    assert len(version_queries) == 1
+
+
+def test_ingredient_search_from_memory(world, client_for,
+                                       django_assert_num_queries):
+    client = client_for()
+    client.get('/api/ingredients/', {'name': 'Продукт'})
+    with django_assert_num_queries(0):
+        response = client.get('/api/ingredients/', {'name': 'Продукт 2'})
+    assert [entry['name'] for entry in response.json()] == ['Продукт 2']
@@ -0,0 +1,119 @@
+import csv
+import io
+import json
+
+import pytest
+
+from recipes import shopping_list
+from recipes.models import ShopCart, ShopCartIngredient
+
+EXPORT_URL = '/api/recipes/download_shopping_cart/'
+
+
+def stored(user):
+    return dict(
+        ShopCartIngredient.objects.filter(user=user)
+        .values_list('ingredient_id', 'amount')
+    )
+
+
+def test_recipe_in_two_carts(world, client_for, make_user):
+    first, second = make_user(), make_user()
+    recipes = world['recipes'][:3]
+    ShopCart.objects.create(user=second, recipe=recipes[0])
+    response = client_for(first).post(
+        '/api/recipes/bulk_shopping_cart/',
+        {'recipes': [recipe.id for recipe in recipes]},
+        format='json',
+    )
+    assert response.status_code in (200, 201), response.content
+    assert stored(first) == {
+        world['ingredients'][0].id: 1,
+        world['ingredients'][1].id: 2 + 1,
+        world['ingredients'][2].id: 3 + 2 + 1,
+        world['ingredients'][3].id: 3 + 2,
+        world['ingredients'][4].id: 3,
+    }
+    assert shopping_list.find_mismatches() == []
+    live = {
+        (user_id, ingredient_id): amount
+        for user_id, ingredient_id, amount
+        in shopping_list.live_totals([first.id])
+    }
+    assert live == {
+        (first.id, ingredient_id): amount
+        for ingredient_id, amount in stored(first).items()
+    }
+
+
+def test_rebuild_users_keeps_totals(world, make_user):
+    first, second = make_user(), make_user()
+    for user in (first, second):
+        ShopCart.objects.create(user=user, recipe=world['recipes'][0])
+    expected = stored(first)
+    shopping_list.rebuild_users([first.id])
+    assert stored(first) == expected
+    assert stored(second) == expected
+
+
+@pytest.fixture
+def cart_client(world, make_user, client_for):
+    user = make_user()
+    ShopCart.objects.create(user=user, recipe=world['recipes'][0])
+    return client_for(user)
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+def test_export_txt(cart_client):
+    response = cart_client.get(f'{EXPORT_URL}?format=txt')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/plain; charset=utf-8'
+    assert 'shopping-list.txt' in response['Content-Disposition']
+    assert content(response) == (
+        'Продукт 0 - 1 г\nПродукт 1 - 2 г\nПродукт 2 - 3 г\n')
+
+
+def test_export_csv(cart_client):
+    response = cart_client.get(EXPORT_URL, HTTP_ACCEPT='text/csv')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'text/csv; charset=utf-8'
+    rows = list(csv.reader(io.StringIO(content(response))))
+    assert rows == [
+        ['name', 'measurement_unit', 'amount'],
+        ['Продукт 0', 'г', '1'],
+        ['Продукт 1', 'г', '2'],
+        ['Продукт 2', 'г', '3'],
+    ]
+
+
+def test_export_json(cart_client):
+    response = cart_client.get(f'{EXPORT_URL}?format=json')
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/json; charset=utf-8'
+    assert json.loads(content(response)) == [
+        {'name': f'Продукт {number}', 'measurement_unit': 'г',
+         'amount': number + 1}
+        for number in range(3)
+    ]
+
+
+def test_export_empty_json(make_user, client_for):
+    response = client_for(make_user()).get(f'{EXPORT_URL}?format=json')
+    assert json.loads(content(response)) == []
+
+
+def test_export_pdf_by_default(cart_client):
+    response = cart_client.get(EXPORT_URL)
+    assert response.status_code == 200
+    assert response['Content-Type'] == 'application/pdf'
+    assert b''.join(response.streaming_content).startswith(b'%PDF')
+
+
+def test_export_requires_auth(client_for):
+    response = client_for().get(f'{EXPORT_URL}?format=csv')
+    assert response.status_code == 401
+    assert response['Content-Type'] == 'application/json'
+    assert 'detail' in response.json()
@@ -0,0 +1,60 @@
+import pytest
+
+from api.serializers import ListRecipeSerializer
+
+CARD = {'id', 'name', 'image', 'image_variants', 'cooking_time'}
+
+
+@pytest.mark.parametrize('query, fields, queries', [
+    ('fields=card', CARD, 2),
+    ('fields=id,name', {'id', 'name'}, 2),
+    ('fields=card,tags', CARD | {'tags'}, 3),
+    ('fields=id,author', {'id', 'author'}, 2),
+    ('omit=ingredients,tags,author',
+     set(ListRecipeSerializer.Meta.fields)
+     - {'ingredients', 'tags', 'author'}, 2),
+    ('omit=ingredients', set(ListRecipeSerializer.Meta.fields)
+     - {'ingredients'}, 3),
+    ('fields=full&omit=text', set(ListRecipeSerializer.Meta.fields)
+     - {'text'}, 4),
+])
+def test_list_fields(world, client_for, django_assert_num_queries,
+                     query, fields, queries):
+    with django_assert_num_queries(queries):
+        response = client_for().get(f'/api/recipes/?limit=6&{query}')
+    assert response.status_code == 200, response.content
+    results = response.json()['results']
+    assert len(results) == 6
+    assert all(set(item) == fields for item in results)
+
+
+def test_detail_fields(world, client_for, django_assert_num_queries):
+    recipe = world['recipes'][0]
+    with django_assert_num_queries(1):
+        response = client_for().get(
+            f'/api/recipes/{recipe.id}/?fields=card')
+    assert response.status_code == 200
+    assert set(response.json()) == CARD
+    assert response.json()['name'] == recipe.name
+
+
+def test_author_fields_resolve_subscriptions(world, make_user, client_for,
+                                             django_assert_num_queries):
+    user = make_user()
+    client = client_for(user)
+    with django_assert_num_queries(4):
+        response = client.get('/api/recipes/?fields=id,author')
+    assert all(
+        item['author']['is_subscribed'] is False
+        for item in response.json()['results']
+    )
+
+
+@pytest.mark.parametrize('query', [
+    'fields=id,secret', 'omit=password', 'fields=card,nope',
+])
+def test_unknown_fields(world, client_for, query):
+    response = client_for().get(f'/api/recipes/?{query}')
+    assert response.status_code == 400
+    param = query.split('=')[0]
+    assert param in response.json()
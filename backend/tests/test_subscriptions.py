@@ -0,0 +1,82 @@
+import pytest
+
+from users.models import Follow
+
+SUBSCRIPTIONS_QUERIES = 5
+
+
+def test_subscribe(world, client_for, make_user):
+    user = make_user()
+    author = world['users'][0]
+    response = client_for(user).post(f'/api/users/{author.id}/subscribe/')
+    assert response.status_code == 201, response.content
+    assert response.json()['id'] == author.id
+    assert response.json()['username'] == author.username
+    assert response.json()['recipes_count'] == 3
+
+
+def test_subscribe_missing_user(world, client_for, make_user):
+    user = make_user()
+    response = client_for(user).post('/api/users/999999/subscribe/')
+    assert response.status_code == 404
+    assert not Follow.objects.filter(user=user).exists()
+
+
+def test_subscribe_twice(world, client_for, make_user):
+    client = client_for(make_user())
+    author = world['users'][0]
+    assert client.post(
+        f'/api/users/{author.id}/subscribe/').status_code == 201
+    response = client.post(f'/api/users/{author.id}/subscribe/')
+    assert response.status_code == 400
+    assert 'error' in response.json()
+
+
+def test_subscribe_to_self(world, client_for):
+    user = world['users'][0]
+    response = client_for(user).post(f'/api/users/{user.id}/subscribe/')
+    assert response.status_code == 400
+
+
+@pytest.fixture
+def follower(world, make_user):
+    user = make_user()
+    for author in world['users']:
+        Follow.objects.create(user=user, following=author)
+    return user
+
+
+@pytest.mark.parametrize('limit', [2, 4])
+def test_subscriptions_queries(follower, client_for,
+                               django_assert_num_queries, limit):
+    client = client_for(follower)
+    with django_assert_num_queries(SUBSCRIPTIONS_QUERIES):
+        response = client.get(f'/api/users/subscriptions/?limit={limit}')
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == limit
+    assert all(item['is_subscribed'] for item in results)
+    assert all(item['recipes_count'] == 3 for item in results)
+    assert all(len(item['recipes']) == 3 for item in results)
+
+
+@pytest.mark.parametrize('recipes_limit, expected', [
+    ('1', 1), ('2', 2), ('10', 3), ('0', 3), ('abc', 3),
+])
+def test_subscriptions_recipes_limit(world, follower, client_for,
+                                     django_assert_num_queries,
+                                     recipes_limit, expected):
+    client = client_for(follower)
+    with django_assert_num_queries(SUBSCRIPTIONS_QUERIES):
+        response = client.get(
+            f'/api/users/subscriptions/?recipes_limit={recipes_limit}')
+    assert response.status_code == 200
+    for item in response.json()['results']:
+        assert item['recipes_count'] == 3
+        newest = [
+            recipe.id for recipe in reversed(world['recipes'])
+            if recipe.author_id == item['id']
+        ]
+        assert [
+            recipe['id'] for recipe in item['recipes']
+        ] == newest[:expected]
@@ -0,0 +1,79 @@
+import pytest
+
+from recipes import tag_masks
+from recipes.models import Recipe, Tag
+
+
+def assert_masks_in_sync():
+    expected = {recipe.id: 0 for recipe in Recipe.objects.only('id')}
+    for recipe_id, tag_id in Recipe.tags.through.objects.values_list(
+            'recipe_id', 'tag_id'):
+        expected[recipe_id] |= tag_masks.tags_mask([tag_id])
+    assert dict(Recipe.objects.values_list('id', 'tags_mask')) == expected
+
+
+def test_masks_after_create(world):
+    assert_masks_in_sync()
+    recipe = world['recipes'][5]
+    assert recipe.tags_mask == tag_masks.tags_mask(
+        tag.id for tag in world['tags'])
+
+
+def test_masks_after_set_and_clear(world):
+    recipe = world['recipes'][0]
+    recipe.tags.set(world['tags'][1:])
+    assert_masks_in_sync()
+    recipe.tags.remove(world['tags'][1])
+    assert_masks_in_sync()
+    recipe.tags.clear()
+    assert_masks_in_sync()
+    assert recipe.tags_mask == 0
+
+
+def test_masks_after_reverse_changes(world):
+    tag = world['tags'][2]
+    tag.tags_recipe.add(*world['recipes'][:3])
+    assert_masks_in_sync()
+    tag.tags_recipe.remove(world['recipes'][2])
+    assert_masks_in_sync()
+    tag.tags_recipe.clear()
+    assert_masks_in_sync()
+
+
+def test_masks_after_tag_delete(world):
+    world['tags'][0].delete()
+    assert_masks_in_sync()
+
+
+def test_rebuild(world):
+    Recipe.objects.update(tags_mask=0)
+    assert tag_masks.rebuild() == len(world['recipes'])
+    assert_masks_in_sync()
+
+
+@pytest.mark.parametrize('slugs', [
+    ['tag0'], ['tag1'], ['tag2'], ['tag0', 'tag2'], ['tag1', 'tag2'],
+])
+def test_filter_matches_join(world, client_for, slugs):
+    query = '&'.join(f'tags={slug}' for slug in slugs)
+    response = client_for().get(f'/api/recipes/?limit=50&{query}')
+    assert response.status_code == 200
+    assert {item['id'] for item in response.json()['results']} == set(
+        Recipe.objects.filter(tags__slug__in=slugs)
+        .values_list('id', flat=True)
+    )
+
+
+def test_filter_beyond_mask(world, client_for):
+    tag = Tag.objects.create(
+        id=tag_masks.MAX_TAG_ID + 1, name='Редкий', color='#123456',
+        slug='rare',
+    )
+    recipe = world['recipes'][0]
+    recipe.tags.add(tag)
+    response = client_for().get('/api/recipes/?limit=50&tags=rare&tags=tag2')
+    assert response.status_code == 200
+    assert {item['id'] for item in response.json()['results']} == set(
+        Recipe.objects.filter(tags__slug__in=['rare', 'tag2'])
+        .values_list('id', flat=True)
+    )
@@ -0,0 +1,109 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.authtoken.models import Token
+
+from users.authentication import TokenCache, token_cache
+
+ME_QUERIES = 1
+
+
+@pytest.fixture(autouse=True)
+def fresh_token_cache():
+    token_cache.entries.clear()
+    yield
+    token_cache.entries.clear()
+
+
+@pytest.fixture
+def shared_cache(settings, tmp_path):
+    settings.CACHES = dict(settings.CACHES, tokens={
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': str(tmp_path / 'tokens'),
+    })
+    settings.TOKEN_AUTH_CACHE_ALIAS = 'tokens'
+
+
+def me(client):
+    return client.get('/api/users/me/').status_code
+
+
+def test_disabled_by_default(make_user, client_for,
+                             django_assert_num_queries):
+    client = client_for(make_user())
+    me(client)
+    with django_assert_num_queries(ME_QUERIES + 1):
+        assert me(client) == 200
+    assert not token_cache.entries
+
+
+def test_single_process_cache(settings, make_user, client_for,
+                              django_assert_num_queries):
+    settings.TOKEN_AUTH_CACHE_SINGLE_PROCESS = True
+    user = make_user()
+    client = client_for(user)
+    me(client)
+    with django_assert_num_queries(ME_QUERIES):
+        assert me(client) == 200
+    Token.objects.filter(user=user).get().delete()
+    assert me(client) == 401
+
+
+def keys_of(user):
+    return Token.objects.filter(user=user).values_list('key', flat=True)
+
+
+def test_shared_invalidation_reaches_other_processes(
+        shared_cache, settings, make_user, client_for):
+    settings.TOKEN_AUTH_CACHE_LOCAL_TIMEOUT = 0
+    user = make_user()
+    client = client_for(user)
+    assert me(client) == 200
+    TokenCache().invalidate(keys_of(user))
+    Token.objects.filter(user=user).update(key='0' * 40)
+    assert me(client) == 401
+
+
+def test_shared_invalidation_keeps_other_tokens(
+        shared_cache, make_user, client_for, django_assert_num_queries):
+    first, second = make_user(), make_user()
+    first_client, second_client = client_for(first), client_for(second)
+    me(first_client)
+    me(second_client)
+    other_process = TokenCache()
+    other_process.invalidate(keys_of(first))
+    token_cache.entries.clear()
+    with django_assert_num_queries(ME_QUERIES):
+        assert me(second_client) == 200
+    with django_assert_num_queries(ME_QUERIES + 1):
+        assert me(first_client) == 200
+
+
+def test_local_hit_skips_shared_cache(shared_cache, make_user, client_for,
+                                      monkeypatch):
+    client = client_for(make_user())
+    me(client)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('обращение к общему кэшу')
+
+    monkeypatch.setattr(token_cache.shared, 'get', fail)
+    assert me(client) == 200
+
+
+def test_stale_lookup_not_cached_after_invalidation(shared_cache, make_user):
+    user = make_user()
+    key = Token.objects.get_or_create(user=user)[0].key
+    cached, generation = token_cache.get(key)
+    assert cached is None
+    TokenCache().invalidate([key])
+    token_cache.set(key, user, generation)
+    token_cache.entries.clear()
+    assert token_cache.get(key)[0] is None
+
+
+def test_local_memory_alias_rejected(settings, make_user, client_for):
+    settings.CACHES = dict(settings.CACHES, tokens={
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'})
+    settings.TOKEN_AUTH_CACHE_ALIAS = 'tokens'
+    with pytest.raises(ImproperlyConfigured):
+        token_cache.shared
@@ -0,0 +1,111 @@
+import io
+import json
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from PIL import Image
+
+from recipes.models import IngredientAmount, Recipe
+
+
+def image_bytes(image_format='PNG', size=(2, 2)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size).save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def form(world, image):
+    return {
+        'name': 'Рецепт из формы',
+        'text': 'Описание',
+        'cooking_time': 10,
+        'tags': [tag.id for tag in world['tags'][:2]],
+        'ingredients': json.dumps([
+            {'id': ingredient.id, 'amount': 2}
+            for ingredient in world['ingredients'][:2]
+        ]),
+        'image': image,
+    }
+
+
+@pytest.fixture
+def author_client(world, client_for):
+    return client_for(world['users'][0])
+
+
+def test_multipart_create(world, author_client):
+    response = author_client.post(
+        '/api/recipes/',
+        form(world, SimpleUploadedFile('photo.png', image_bytes())),
+        format='multipart',
+    )
+    assert response.status_code == 201, response.content
+    recipe = Recipe.objects.get(id=response.json()['id'])
+    assert recipe.image.name.endswith('.png')
+    assert len(response.json()['tags']) == 2
+    assert dict(
+        IngredientAmount.objects.filter(recipe=recipe)
+        .values_list('ingredient_id', 'amount')
+    ) == {ingredient.id: 2 for ingredient in world['ingredients'][:2]}
+
+
+def test_multipart_too_large(world, author_client, settings):
+    settings.RECIPE_IMAGE_MAX_SIZE = 100
+    image = SimpleUploadedFile('photo.png', image_bytes(size=(200, 200)))
+    response = author_client.post(
+        '/api/recipes/', form(world, image), format='multipart')
+    assert response.status_code == 413
+    assert not Recipe.objects.filter(name='Рецепт из формы').exists()
+
+
+@pytest.mark.parametrize('content', [b'not an image', image_bytes('BMP')])
+def test_multipart_invalid_image(world, author_client, content):
+    image = SimpleUploadedFile('photo.png', content)
+    response = author_client.post(
+        '/api/recipes/', form(world, image), format='multipart')
+    assert response.status_code == 400
+    assert 'image' in response.json()
+
+
+def put_image(client, recipe, content, content_type='image/png'):
+    return client.generic(
+        'PUT', f'/api/recipes/{recipe.id}/image/', content,
+        content_type=content_type,
+    )
+
+
+def test_raw_upload(world, author_client):
+    recipe = world['recipes'][0]
+    response = put_image(
+        author_client, recipe, image_bytes('JPEG'), 'image/jpeg')
+    assert response.status_code == 200, response.content
+    recipe.refresh_from_db()
+    assert recipe.image.name.endswith('.jpg')
+
+
+def test_raw_upload_too_large(world, author_client, settings):
+    settings.RECIPE_IMAGE_MAX_SIZE = 100
+    recipe = world['recipes'][0]
+    response = put_image(author_client, recipe, image_bytes(size=(200, 200)))
+    assert response.status_code == 413
+    recipe.refresh_from_db()
+    assert recipe.image.name == 'recipes/image.jpg'
+
+
+def test_raw_upload_too_many_pixels(world, author_client, settings):
+    settings.RECIPE_IMAGE_MAX_DIMENSIONS = (10, 10)
+    response = put_image(
+        author_client, world['recipes'][0], image_bytes(size=(20, 5)))
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('content', [b'not an image', image_bytes('BMP')])
+def test_raw_upload_invalid(world, author_client, content):
+    response = put_image(author_client, world['recipes'][0], content)
+    assert response.status_code == 400
+
+
+def test_raw_upload_by_other_user(world, client_for):
+    response = put_image(
+        client_for(world['users'][1]), world['recipes'][0], image_bytes())
+    assert response.status_code == 403
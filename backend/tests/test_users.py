@@ -0,0 +1,43 @@
+import pytest
+
+from users.models import Follow
+
+LIST_QUERIES = 4
+
+
+@pytest.mark.parametrize('extra_users', [0, 8])
+def test_users_list_queries(world, make_user, client_for,
+                            django_assert_num_queries, extra_users):
+    user = make_user()
+    followed = world['users'][:2]
+    for author in followed:
+        Follow.objects.create(user=user, following=author)
+    for _ in range(extra_users):
+        make_user()
+    client = client_for(user)
+    with django_assert_num_queries(LIST_QUERIES):
+        response = client.get('/api/users/')
+    assert response.status_code == 200
+    results = response.json()['results']
+    assert len(results) == min(5 + extra_users, 6)
+    assert {
+        item['id'] for item in results if item['is_subscribed']
+    } == {author.id for author in followed}
+
+
+def test_users_list_anonymous(world, client_for, django_assert_num_queries):
+    with django_assert_num_queries(LIST_QUERIES - 2):
+        response = client_for().get('/api/users/')
+    assert response.status_code == 200
+    assert not any(
+        item['is_subscribed'] for item in response.json()['results'])
+
+
+def test_user_detail_subscription(world, make_user, client_for):
+    user = make_user()
+    author = world['users'][0]
+    Follow.objects.create(user=user, following=author)
+    client = client_for(user)
+    assert client.get(f'/api/users/{author.id}/').json()['is_subscribed']
+    other = world['users'][1]
+    assert not client.get(f'/api/users/{other.id}/').json()['is_subscribed']
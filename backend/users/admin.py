@@ -1,3 +1,4 @@
+from api.pagination import EstimatedCountPaginator
 from django.contrib import admin
 
 from users.models import Follow
@@ -6,5 +7,8 @@ from users.models import Follow
 @admin.register(Follow)
 class FollowAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'following')
-    search_fields = ('user', 'following')
-    list_filter = ('id', 'user')
+    list_select_related = ('user', 'following')
+    autocomplete_fields = ('user', 'following')
+    search_fields = ('^user__username', '^following__username')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+logger = logging.getLogger('foodgram.token_cache')
+
+User = get_user_model()
+CACHE_KEY = 'auth_token:{}'
+TOMBSTONE = 'invalidated'
+
+
+def dump_user(user):
+    return user._state.db, tuple(
+        getattr(user, field.attname) for field in User._meta.concrete_fields)
+
+
+def load_user(db, values):
+    return User.from_db(
+        db, [field.attname for field in User._meta.concrete_fields], values)
+
+
+class TokenCache:
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.local_generation = 0
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    @property
+    def enabled(self):
+        return bool(
+            settings.TOKEN_AUTH_CACHE_ALIAS
+            or settings.TOKEN_AUTH_CACHE_SINGLE_PROCESS
+        )
+
+    @property
+    def shared(self):
+        alias = settings.TOKEN_AUTH_CACHE_ALIAS
+        if not alias:
+            return None
+        cache = caches[alias]
+        if isinstance(cache, LocMemCache):
+            raise ImproperlyConfigured(
+                'TOKEN_AUTH_CACHE_ALIAS должен указывать на кэш, общий '
+                'для всех процессов, а не на LocMemCache')
+        return cache
+
+    @staticmethod
+    def shared_key(key):
+        return CACHE_KEY.format(hashlib.sha256(key.encode()).hexdigest())
+
+    def local_timeout(self):
+        if self.shared is None:
+            return settings.TOKEN_AUTH_CACHE_TIMEOUT
+        return min(
+            settings.TOKEN_AUTH_CACHE_LOCAL_TIMEOUT,
+            settings.TOKEN_AUTH_CACHE_TIMEOUT,
+        )
+
+    def get(self, key):
+        with self.lock:
+            generation = self.local_generation
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self.entries[key]
+                entry = None
+            if entry is not None:
+                self.entries.move_to_end(key)
+        if entry is not None:
+            self.count('local_hits')
+            return load_user(*entry[1]), generation
+        if self.shared is not None:
+            data = self.shared.get(self.shared_key(key))
+            if data is not None and data != TOMBSTONE:
+                self.store_local(key, generation, data)
+                self.count('shared_hits')
+                return load_user(*data), generation
+        self.count('misses')
+        return None, generation
+
+    def set(self, key, user, generation):
+        data = dump_user(user)
+        if not self.store_local(key, generation, data):
+            return
+        if self.shared is not None:
+            self.shared.add(
+                self.shared_key(key), data, settings.TOKEN_AUTH_CACHE_TIMEOUT)
+
+    def store_local(self, key, generation, data):
+        expires = time.monotonic() + self.local_timeout()
+        with self.lock:
+            if generation != self.local_generation:
+                return False
+            self.entries[key] = (expires, data)
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.TOKEN_AUTH_CACHE_SIZE:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+        return True
+
+    def invalidate(self, keys):
+        if not self.enabled:
+            return
+        keys = list(keys)
+        with self.lock:
+            self.local_generation += 1
+            for key in keys:
+                self.entries.pop(key, None)
+        if self.shared is not None and keys:
+            self.shared.set_many(
+                {self.shared_key(key): TOMBSTONE for key in keys},
+                self.local_timeout(),
+            )
+        self.count('invalidations')
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+            lookups = (
+                self.stats['local_hits'] + self.stats['shared_hits']
+                + self.stats['misses']
+            )
+            every = settings.TOKEN_AUTH_CACHE_STATS_EVERY
+            if name == 'invalidations' or not every or lookups % every:
+                return
+            stats = dict(self.stats, size=len(self.entries))
+        logger.info(json.dumps(stats))
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+
+    def authenticate_credentials(self, key):
+        if not token_cache.enabled:
+            return super().authenticate_credentials(key)
+        user, generation = token_cache.get(key)
+        if user is not None:
+            return user, Token(key=key, user=user)
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, generation)
+        return user, token
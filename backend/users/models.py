@@ -27,6 +27,12 @@ class Follow(models.Model):
                     'following'),
                 name='unique_follow')
         ]
+        indexes = [
+            models.Index(
+                fields=('following', 'user'),
+                name='follow_following_user_idx',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user} - {self.following}'
@@ -1,10 +1,13 @@
+from api.fields import BulkPrimaryKeyRelatedField, ImageVariantsField
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Manager
 from djoser.serializers import UserCreateSerializer, UserSerializer
 from recipes.models import Recipe
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
-from users.models import Follow
+from users.subscriptions import SubscriptionResolver, get_recipes_limit
 
 User = get_user_model()
 
@@ -36,10 +39,32 @@ class CustomUserCreateSerializer(UserCreateSerializer):
         }
 
 
+class AuthorListSerializer(serializers.ListSerializer):
+    author_field = None
+
+    def to_representation(self, data):
+        iterable = list(data.all() if isinstance(data, Manager) else data)
+        request = self.context.get('request')
+        if request is not None and self.has_authors():
+            SubscriptionResolver.for_request(request).prime(
+                self.get_author_id(item) for item in iterable
+            )
+        return super().to_representation(iterable)
+
+    def has_authors(self):
+        return True
+
+    def get_author_id(self, item):
+        if self.author_field is None:
+            return item.pk
+        return getattr(item, self.author_field)
+
+
 class CustomUserSerializer(UserSerializer):
     is_subscribed = serializers.SerializerMethodField()
 
     class Meta:
+        list_serializer_class = AuthorListSerializer
         fields = (
             'id',
             'first_name',
@@ -51,22 +76,28 @@ class CustomUserSerializer(UserSerializer):
         model = User
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        if user.is_authenticated:
-            return Follow.objects.filter(user=user, following=obj).exists()
+        request = self.context.get('request')
+        return SubscriptionResolver.for_request(request).is_subscribed(obj.pk)
 
 
 class RecipeForFollowSerializer(serializers.ModelSerializer):
+    image_variants = ImageVariantsField()
+
     class Meta:
         model = Recipe
         fields = (
             'id',
             'name',
             'image',
+            'image_variants',
             'cooking_time'
         )
 
 
+class FollowListSerializer(AuthorListSerializer):
+    author_field = 'following_id'
+
+
 class ListFollowSerializer(serializers.ModelSerializer):
     email = serializers.ReadOnlyField(source='user.email')
     id = serializers.ReadOnlyField(source='following.id')
@@ -89,17 +120,38 @@ class ListFollowSerializer(serializers.ModelSerializer):
             'recipes_count',
         )
         model = User
+        list_serializer_class = FollowListSerializer
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return Follow.objects.filter(user=user, following=obj.id).exists()
+        request = self.context.get('request')
+        return SubscriptionResolver.for_request(request).is_subscribed(
+            obj.following_id)
 
     def get_recipes(self, obj):
-        recipes = Recipe.objects.filter(author=obj.following)
+        recipes = getattr(obj.following, 'limited_recipes', None)
+        if recipes is None:
+            recipes = obj.following.author_recipe.all()
+            recipes_limit = get_recipes_limit(self.context.get('request'))
+            if recipes_limit:
+                recipes = recipes[:recipes_limit]
         serializer = RecipeForFollowSerializer(recipes, many=True)
         return serializer.data
 
     def get_recipes_count(self, obj):
-        return Recipe.objects.filter(author=obj.id).count()
+        stats = getattr(obj.following, 'author_stats', None)
+        return stats.recipes_count if stats else 0
+
+
+class BulkAuthorsSerializer(serializers.Serializer):
+    authors = BulkPrimaryKeyRelatedField(
+        many=True,
+        queryset=User.objects.only('id'),
+        max_length=settings.BULK_ACTION_MAX_ITEMS,
+    )
+
+    def validate_authors(self, authors):
+        author_ids = list(dict.fromkeys(author.id for author in authors))
+        if self.context['request'].user.id in author_ids:
+            raise serializers.ValidationError(
+                'Нельзя подписаться на самого себя')
+        return author_ids
@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from users.authentication import token_cache
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    token_cache.invalidate([instance.key])
+
+
+@receiver(post_save, sender=User)
+def forget_changed_user_tokens(sender, instance, created, update_fields,
+                               **kwargs):
+    if not created and update_fields != {'last_login'}:
+        token_cache.invalidate(
+            Token.objects.filter(user=instance).values_list('key', flat=True))
@@ -0,0 +1,43 @@
+from users.models import Follow
+
+
+class SubscriptionResolver:
+
+    def __init__(self, user):
+        self.user = user
+        self.resolved = set()
+        self.following = set()
+
+    @classmethod
+    def for_request(cls, request):
+        resolver = getattr(request, '_subscription_resolver', None)
+        if resolver is None:
+            resolver = cls(request.user)
+            request._subscription_resolver = resolver
+        return resolver
+
+    def prime(self, author_ids):
+        if not self.user.is_authenticated:
+            return
+        missing = set(author_ids) - self.resolved
+        if not missing:
+            return
+        self.following.update(
+            Follow.objects.filter(
+                user=self.user, following_id__in=missing
+            ).values_list('following_id', flat=True)
+        )
+        self.resolved.update(missing)
+
+    def is_subscribed(self, author_id):
+        if not self.user.is_authenticated:
+            return False
+        self.prime([author_id])
+        return author_id in self.following
+
+
+def get_recipes_limit(request):
+    recipes_limit = request.query_params.get('recipes_limit')
+    if recipes_limit is None or not recipes_limit.isdigit():
+        return None
+    return int(recipes_limit) or None
@@ -1,12 +1,16 @@
 from django.urls import include, path
 
-from users.views import FollowApiView, FollowListViewSet
+from users.views import BulkFollowApiView, FollowApiView, FollowListViewSet
 
 urlpatterns = [
     path(
         'users/subscriptions/',
         FollowListViewSet.as_view(),
         name='subscriptions'),
+    path(
+        'users/bulk_subscribe/',
+        BulkFollowApiView.as_view(),
+        name='bulk_subscribe'),
     path(
         'users/<int:pk>/subscribe/',
         FollowApiView.as_view(),
@@ -1,12 +1,17 @@
 from api.pagination import CustomPagination
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from recipes import feed
+from recipes.models import Recipe
 from rest_framework import permissions, status
 from rest_framework.generics import ListAPIView, get_object_or_404
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from users.models import Follow
-from users.serializers import ListFollowSerializer
+from users.serializers import BulkAuthorsSerializer, ListFollowSerializer
+from users.subscriptions import get_recipes_limit
 
 User = get_user_model()
 
@@ -15,29 +20,71 @@ class FollowApiView(APIView):
     def post(self, request, pk):
         user = request.user
         following = get_object_or_404(User, id=pk)
-        if user == following:
+        if user.id == following.id:
             return Response(
                 {'error': 'Нельзя подписаться на самого себя'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        if Follow.objects.filter(user=user, following=following).exists():
+        try:
+            with transaction.atomic():
+                create_follow = Follow.objects.create(
+                    user=user, following=following)
+        except IntegrityError:
             return Response(
                 {'error': 'Вы уже подписаны на данного автора'},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        create_follow = Follow.objects.create(user=user, following=following)
         serializer = ListFollowSerializer(
             create_follow, context={'request': request})
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
     def delete(self, request, pk):
-        user = request.user
-        following = get_object_or_404(User, id=pk)
-        delete_follow = Follow.objects.filter(user=user, following=following)
-        if delete_follow.exists():
-            delete_follow.delete()
+        deleted, _ = Follow.objects.filter(
+            user=request.user, following_id=pk).delete()
+        if not deleted:
+            get_object_or_404(User, id=pk)
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class BulkFollowApiView(APIView):
+    def post(self, request):
+        serializer = BulkAuthorsSerializer(
+            data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        author_ids = serializer.validated_data['authors']
+        with transaction.atomic():
+            Follow.objects.bulk_create(
+                [
+                    Follow(user=request.user, following_id=author_id)
+                    for author_id in author_ids
+                ],
+                ignore_conflicts=True,
+            )
+            feed.add_authors(request.user.id, author_ids)
+        return Response(
+            {'authors': author_ids}, status=status.HTTP_201_CREATED)
+
+    def delete(self, request):
+        serializer = BulkAuthorsSerializer(
+            data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        author_ids = serializer.validated_data['authors']
+        if not author_ids:
             return Response(status=status.HTTP_204_NO_CONTENT)
-        return Response(status=status.HTTP_400_BAD_REQUEST)
+        with transaction.atomic():
+            # Удаляем без ORM, чтобы не вызывать сигналы на каждую
+            # подписку: ленту чистим ниже одним запросом, а на подписки
+            # никто не ссылается.
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {Follow._meta.db_table} '
+                    f'WHERE user_id = %s AND following_id IN '
+                    f'({", ".join(["%s"] * len(author_ids))})',
+                    [request.user.id, *author_ids],
+                )
+            feed.remove_authors(request.user.id, author_ids)
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class FollowListViewSet(ListAPIView):
@@ -48,4 +95,21 @@ class FollowListViewSet(ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return Follow.objects.filter(user=user)
+        recipes = Recipe.objects.all()
+        recipes_limit = get_recipes_limit(self.request)
+        if recipes_limit:
+            recipes = recipes.filter(id__in=Subquery(
+                Recipe.objects.filter(author=OuterRef('author'))
+                .order_by('-created_date', '-id')
+                .values('id')[:recipes_limit]
+            ))
+        return (
+            Follow.objects.filter(user=user)
+            .select_related('user', 'following__author_stats')
+            .prefetch_related(Prefetch(
+                'following__author_recipe',
+                queryset=recipes,
+                to_attr='limited_recipes',
+            ))
+            .order_by('-id')
+        )